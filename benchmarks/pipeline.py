@@ -0,0 +1,438 @@
+# benchmarks/pipeline.py
+"""Offline end-to-end latency benchmark for the text pipeline.
+
+Usage: python -m benchmarks.pipeline [--corpus FILE] [--concurrency 1,4,16]
+       [--latency groq=0.35] [--source chat|voice] [--compare RESULTS.json]
+
+Drives a real Coordinator and EventBus with utterances from a corpus.
+Groq, OpenWeather, dictionaryapi.dev and JokeAPI are replaced by local
+stand-ins with injected latency. Speech is a stub that sleeps for the
+"tts" latency, and browser-opening actions are no-ops. All state lives in
+a temporary directory, so the real reminders, caches and dictionary are
+never touched.
+
+The corpus is JSONL with "text", and optionally the "intent" and "slots"
+the Groq stand-in should answer with. Results are written to
+data/benchmarks/ and can be compared with an earlier run via --compare.
+"""
+import argparse
+import itertools
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs
+import requests
+from requests.adapters import BaseAdapter
+import config.settings as settings
+
+STAGES = ["queue", "intent", "action", "respond", "tts", "end_to_end"]
+
+DEFAULT_LATENCY = {"groq": 0.35, "weather": 0.15, "dictionary": 0.2, "joke": 0.25, "tts": 0.05}
+
+CORPUS = [
+    {"text": "what time is it"},
+    {"text": "what's the date today"},
+    {"text": "tell me a joke"},
+    {"text": "hello"},
+    {"text": "what's the weather in London"},
+    {"text": "weather in Tokyo"},
+    {"text": "define serendipity"},
+    {"text": "what does ephemeral mean"},
+    {"text": "calculate 12 times 7"},
+    {"text": "set a timer for 5 minutes"},
+    {"text": "what timers do I have"},
+    {"text": "search for cheap flights to Rome"},
+    {"text": "could you maybe tell me something funny", "intent": "joke", "slots": {}},
+    {"text": "is it going to rain in Paris", "intent": "weather", "slots": {"city": "Paris"}},
+    {"text": "remind me to call mom tomorrow at 6pm", "intent": "reminder_set",
+     "slots": {"text": "call mom", "datetime": "tomorrow at 6pm"}},
+    {"text": "what have I got on today", "intent": "reminder_list", "slots": {"datetime": "today"}},
+    {"text": "I'd like to hear some jazz", "intent": "play_music", "slots": {"song": "jazz"}},
+    {"text": "what's the meaning of the word ubiquitous", "intent": "define", "slots": {"word": "ubiquitous"}},
+    {"text": "how's it going buddy", "intent": "small_talk", "slots": {"text": "how's it going buddy"}},
+    {"text": "do you know what day it is", "intent": "date", "slots": {}},
+]
+
+class _Jitter:
+    def __init__(self, latency: Dict[str, float], seed: int):
+        self.latency = latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str) -> float:
+        """Injected latency for one call: the configured median with a long tail"""
+        with self._lock:
+            return self.latency.get(name, 0.0) * self._random.lognormvariate(0, 0.35)
+
+class StandInAPIs(BaseAdapter):
+    """requests transport answering OpenWeather, dictionaryapi.dev and JokeAPI locally"""
+
+    HOSTS = {
+        "api.openweathermap.org": "weather",
+        "api.dictionaryapi.dev": "dictionary",
+        "v2.jokeapi.dev": "joke",
+    }
+
+    def __init__(self, jitter: _Jitter):
+        super().__init__()
+        self.jitter = jitter
+        self._jokes = itertools.count(1)
+        self._cities = {}
+
+    def send(self, request, timeout=None, **kwargs):
+        url = urlparse(request.url)
+        name = self.HOSTS[url.hostname]
+        delay = self.jitter(name)
+        limit = timeout[1] if isinstance(timeout, tuple) else timeout
+        if limit is not None and delay > limit:
+            time.sleep(limit)
+            raise requests.ReadTimeout(f"stand-in {name} took {delay:.2f}s")
+        time.sleep(delay)
+
+        body = getattr(self, f"_{name}")(url.path, parse_qs(url.query))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(body).encode("utf-8")
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+    def _weather(self, path, query):
+        if "id" in query:
+            city_id = int(query["id"][0])
+            name = self._cities.get(city_id, "Somewhere")
+        else:
+            name = query["q"][0].title()
+            city_id = sum(map(ord, name)) * 7919 % 1000003
+            self._cities[city_id] = name
+        return {"cod": 200, "id": city_id, "name": name,
+                "main": {"temp": 18.5}, "weather": [{"description": "scattered clouds"}]}
+
+    def _dictionary(self, path, query):
+        word = path.rsplit("/", 1)[-1]
+        return [{"word": word, "meanings": [
+            {"partOfSpeech": "noun", "definitions": [{"definition": f"A stand-in definition of {word}."}]},
+        ]}]
+
+    def _joke(self, path, query):
+        return {"type": "single", "joke": f"Stand-in joke number {next(self._jokes)}."}
+
+class StandInGroq:
+    """Answers chat.completions.with_raw_response.create from corpus labels"""
+
+    def __init__(self, labels: Dict[str, dict], jitter: _Jitter):
+        self.labels = labels
+        self.jitter = jitter
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    def create(self, model, messages, max_tokens=150, temperature=0.1, stream=False):
+        text = messages[-1]["content"]
+        answer = json.dumps(self.labels.get(text) or {"intent": "unknown", "slots": {}})
+        return _StandInResponse(answer, self.jitter("groq"), stream)
+
+class _StandInResponse:
+    headers = {}
+
+    def __init__(self, answer: str, delay: float, stream: bool):
+        self.answer = answer
+        self.delay = delay
+        self.stream = stream
+
+    def parse(self):
+        if self.stream:
+            return self._chunks()
+        time.sleep(self.delay)
+        usage = SimpleNamespace(prompt_tokens=200, completion_tokens=len(self.answer) // 4)
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message)])
+
+    def _chunks(self):
+        # The injected latency is time to first token; tokens follow quickly
+        time.sleep(self.delay)
+        for i in range(0, len(self.answer), 4):
+            delta = SimpleNamespace(content=self.answer[i:i + 4])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)
+            time.sleep(0.002)
+
+class _Command:
+    def __init__(self, text: str):
+        self.text = text
+        self.marks = {"published": time.monotonic()}
+        self.done = threading.Event()
+
+class _Tracker:
+    """Matches pipeline callbacks to the command that caused them.
+
+    Each client's commands are handled in order, so the oldest waiting
+    command with a given text is taken to be the one being processed.
+    Identical texts in flight from different clients may swap marks,
+    which only trades samples between equivalent commands.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._awaiting_detect = defaultdict(deque)
+        self._awaiting_response = defaultdict(deque)
+        self._local = threading.local()
+
+    def submitted(self, command: _Command):
+        with self._lock:
+            self._awaiting_detect[command.text].append(command)
+
+    def wrap_detect(self, detect):
+        def timed(text, *args, **kwargs):
+            with self._lock:
+                pending = self._awaiting_detect.get(text)
+                command = pending.popleft() if pending else None
+            self._local.command = command
+            if command:
+                command.marks["detect_start"] = time.monotonic()
+            try:
+                return detect(text, *args, **kwargs)
+            finally:
+                if command:
+                    command.marks["detect_end"] = time.monotonic()
+                    with self._lock:
+                        self._awaiting_response[text].append(command)
+        return timed
+
+    def wrap_execute(self, execute):
+        def timed(*args, **kwargs):
+            command = getattr(self._local, "command", None)
+            if command:
+                command.marks["execute_start"] = time.monotonic()
+            try:
+                return execute(*args, **kwargs)
+            finally:
+                if command:
+                    command.marks["execute_end"] = time.monotonic()
+        return timed
+
+    def responded(self, original_text: str, speak_seconds: float = 0.0):
+        received = time.monotonic()
+        with self._lock:
+            pending = self._awaiting_response.get(original_text)
+            command = pending.popleft() if pending else None
+        if speak_seconds:
+            time.sleep(speak_seconds)
+        if command:
+            command.marks["response"] = received
+            command.marks["spoken"] = time.monotonic()
+            command.done.set()
+
+def _spans(command: _Command) -> Dict[str, float]:
+    m = command.marks
+    return {
+        "queue": m["detect_start"] - m["published"],
+        "intent": m["detect_end"] - m["detect_start"],
+        "action": m["execute_end"] - m["execute_start"],
+        "respond": m["response"] - m["execute_end"],
+        "tts": m["spoken"] - m["response"],
+        "end_to_end": m["spoken"] - m["published"],
+    }
+
+def _percentiles(values: List[float]) -> dict:
+    from core.tracing import percentile
+    ms = {}
+    for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        seconds = percentile(values, q)
+        ms[name] = seconds * 1000 if seconds is not None else None
+    return ms
+
+def _run_level(corpus: List[dict], concurrency: int, commands: int, source: str,
+               jitter: _Jitter, state_dir: Path, seed: int) -> dict:
+    from core.coordinator import Coordinator
+    from core.event_bus import EventBus, Event, EventType
+
+    shutil.rmtree(state_dir, ignore_errors=True)
+    state_dir.mkdir(parents=True)
+
+    bus = EventBus()
+    # As server.py does, so chat sessions are spread over as many workers
+    coordinator = Coordinator(bus, chat_workers=concurrency)
+    tracker = _Tracker()
+    coordinator.intent_processor.detect = tracker.wrap_detect(coordinator.intent_processor.detect)
+    coordinator.action_service.execute = tracker.wrap_execute(coordinator.action_service.execute)
+    if source == "voice":
+        input_type = EventType.VOICE_INPUT
+        bus.subscribe(EventType.SPEAK_RESPONSE, lambda e: tracker.responded(e.data.get("original_text"), jitter("tts")))
+    else:
+        input_type = EventType.CHAT_INPUT
+        bus.subscribe(EventType.CHAT_RESPONSE, lambda e: tracker.responded(e.data.get("original_text")))
+    coordinator.action_service.start()
+
+    texts = [entry["text"] for entry in corpus]
+    random.Random(seed).shuffle(texts)
+    feed = itertools.islice(itertools.cycle(texts), commands)
+    feed_lock = threading.Lock()
+    finished, lost = [], []
+
+    def client(session: str):
+        while True:
+            with feed_lock:
+                text = next(feed, None)
+            if text is None:
+                return
+            command = _Command(text)
+            tracker.submitted(command)
+            # Each client is its own chat session, partitioned like a server client
+            bus.publish_async(Event(input_type, {"text": text, "session": session}, source=source))
+            if command.done.wait(30):
+                finished.append(command)
+            else:
+                lost.append(command)
+
+    start = time.monotonic()
+    clients = [threading.Thread(target=client, args=(f"bench-{i}",)) for i in range(concurrency)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    outcomes = coordinator.intent_processor.stats()["outcomes"]
+    bus.shutdown()
+    coordinator.shutdown()
+
+    spans = defaultdict(list)
+    for command in finished:
+        for stage, seconds in _spans(command).items():
+            spans[stage].append(seconds)
+    return {
+        "commands": len(finished),
+        "lost": len(lost),
+        "seconds": elapsed,
+        "throughput": len(finished) / elapsed if elapsed else 0.0,
+        "intent_paths": outcomes,
+        "stages": {stage: _percentiles(spans[stage]) for stage in STAGES},
+    }
+
+def _isolate(state_dir: Path, verbose: bool):
+    """Point every persistent path at state_dir; must run before the pipeline is imported"""
+    settings.REMINDERS_FILE = state_dir / "reminders.json"
+    settings.REMINDERS_DB = state_dir / "reminders.db"
+    settings.INTENT_CACHE_FILE = state_dir / "intent_cache.json"
+    settings.TTS_CACHE_DIR = state_dir / "tts_cache"
+    settings.WEATHER_CITIES_FILE = state_dir / "weather_cities.json"
+    settings.DICTIONARY_FILE = state_dir / "dictionary.bin"
+    settings.DICTIONARY_PENDING_FILE = state_dir / "dictionary_pending.jsonl"
+    # The stand-in has no quota; the client-side limiter would only add noise
+    settings.GROQ_REQUESTS_PER_MINUTE = 10 ** 6
+    settings.GROQ_TOKENS_PER_MINUTE = 10 ** 9
+    settings.DEBUG = verbose
+
+def run(corpus: List[dict], levels: List[int], commands: int, latency: Dict[str, float],
+        source: str = "chat", seed: int = 1, verbose: bool = False) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="nex-bench-"))
+    _isolate(workdir / "state", verbose)
+    jitter = _Jitter(latency, seed)
+
+    import webbrowser
+    from services.http_client import http_client
+    from services.llm_gateway import llm_gateway
+
+    webbrowser.open = lambda *args, **kwargs: True
+    adapter = StandInAPIs(jitter)
+    for host in StandInAPIs.HOSTS:
+        http_client.session.mount(f"https://{host}", adapter)
+    labels = {e["text"]: {"intent": e["intent"], "slots": e.get("slots", {})} for e in corpus if "intent" in e}
+    llm_gateway.client = StandInGroq(labels, jitter)
+
+    try:
+        results = {
+            str(level): _run_level(corpus, level, commands, source, jitter, workdir / "state", seed)
+            for level in levels
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "source": source,
+        "commands": commands,
+        "latency": latency,
+        "levels": results,
+        "gateway": llm_gateway.stats(),
+    }
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def _print(results: dict, previous: dict = None):
+    for level, result in results["levels"].items():
+        print(f"\nconcurrency {level}: {result['commands']} commands, {result['lost']} lost, "
+              f"{result['throughput']:.1f}/s, intent paths {result['intent_paths']}")
+        before = (previous or {}).get("levels", {}).get(level, {}).get("stages", {})
+        for stage in STAGES:
+            p = result["stages"][stage]
+            if p["p50_ms"] is None:
+                continue
+            line = f"{stage:>12}: p50 {p['p50_ms']:8.1f}  p95 {p['p95_ms']:8.1f}  p99 {p['p99_ms']:8.1f} ms"
+            old = before.get(stage, {}).get("p95_ms")
+            if old:
+                line += f"   p95 {(p['p95_ms'] - old) / old:+.0%} vs {old:.1f}"
+            print(line)
+
+def _read_corpus(path: Path) -> List[dict]:
+    corpus = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line:
+            corpus.append(json.loads(line) if line.startswith("{") else {"text": line})
+    return corpus
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Offline latency benchmark for the text pipeline")
+    parser.add_argument("--corpus", type=Path, help="JSONL of text (+ intent, slots); built-in corpus if omitted")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated client counts")
+    parser.add_argument("--commands", type=int, default=200, help="commands per concurrency level")
+    parser.add_argument("--latency", action="append", default=[], metavar="NAME=SECONDS",
+                        help=f"median injected latency for {', '.join(DEFAULT_LATENCY)}")
+    parser.add_argument("--source", choices=["chat", "voice"], default="chat")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, help="results file (default: data/benchmarks/pipeline-<time>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare p95 against")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's debug output")
+    args = parser.parse_args(argv)
+
+    latency = dict(DEFAULT_LATENCY)
+    for item in args.latency:
+        name, _, seconds = item.partition("=")
+        if name not in latency:
+            parser.error(f"unknown latency {name!r}")
+        latency[name] = float(seconds)
+
+    corpus = _read_corpus(args.corpus) if args.corpus else CORPUS
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = run(corpus, levels, args.commands, latency, args.source, args.seed, args.verbose)
+
+    previous = json.loads(args.compare.read_text()) if args.compare else None
+    _print(results, previous)
+
+    out = args.out or settings.BASE_DIR / "data" / "benchmarks" / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/wake_word.py
+"""Offline wake word gate benchmark.
+
+Usage: python -m benchmarks.wake_word FIXTURES_DIR
+
+FIXTURES_DIR holds WAV files in two folders: wake/ (utterances that start
+with a wake word) and other/ (speech or noise without one).
+"""
+import sys
+import time
+from pathlib import Path
+import speech_recognition as sr
+from services.wake_word import WakeWordGate
+
+def _load(path: Path) -> sr.AudioData:
+    with sr.AudioFile(str(path)) as source:
+        return sr.Recognizer().record(source)
+
+def run(fixtures: Path) -> dict:
+    gate = WakeWordGate()
+    if not gate.available:
+        raise SystemExit("pocketsphinx is required to benchmark the wake word gate")
+
+    results = {"wake": [0, 0], "other": [0, 0]}  # [passed, total]
+    latencies = []
+    for label in results:
+        for path in sorted((fixtures / label).glob("*.wav")):
+            audio = _load(path)
+            start = time.perf_counter()
+            passed = gate.process(audio) is not None
+            latencies.append(time.perf_counter() - start)
+            results[label][0] += passed
+            results[label][1] += 1
+
+    latencies.sort()
+    wake_passed, wake_total = results["wake"]
+    other_passed, other_total = results["other"]
+    total = wake_total + other_total
+    return {
+        "files": total,
+        "detection_rate": wake_passed / wake_total if wake_total else 0.0,
+        "false_accept_rate": other_passed / other_total if other_total else 0.0,
+        "stt_calls_avoided": total - wake_passed - other_passed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        **gate.stats(),
+    }
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        raise SystemExit(__doc__)
+    for key, value in run(Path(sys.argv[1])).items():
+        print(f"{key:>18}: {value:.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
@@ -1,5 +1,4 @@
 # config/settings.py
-import os
 from pathlib import Path
 
 # API Keys
@@ -7,12 +6,160 @@ GROQ_API_KEY = "<GROQ_API_KEY>"
 OPENWEATHER_API_KEY = "<OPENWEATHER_API_KEY>"
 
 # Audio Settings
-AUDIO_TEMP_FILE = "temp_nex_audio.mp3"
 WAKE_WORDS = {"nex", "next", "necks", "neks", "lex", "nacks", "neck", "nek"}
 
+# Microphone Capture
+MIC_RING_SECONDS = 10  # Audio kept while the recognizer is busy
+MIC_PRE_ROLL_SECONDS = 0.3  # Audio kept before speech onset
+MIC_PAUSE_SECONDS = 0.8  # Silence that ends a phrase
+MIC_ENERGY_RATIO = 1.5  # Speech threshold relative to the noise floor
+MIC_MIN_ENERGY = 300
+
+# Wake Word Gate (needs pocketsphinx, otherwise every phrase goes to cloud STT)
+WAKE_THRESHOLD = 1e-10  # pocketsphinx keyword threshold; closer to 1 wakes less often on noise
+WAKE_MIN_SPEECH_SECONDS = 0.25
+WAKE_VAD_RATIO = 3.0  # Voiced window energy relative to the phrase noise floor
+
+# Event Bus
+EVENT_QUEUE_SIZE = 32  # Pending events per worker before publishers block
+
+# HTTP Client
+HTTP_POOL_SIZE = 8  # Kept-alive connections per host
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.2  # Seconds, doubled per retry before jitter
+HTTP_DEFAULT_BUDGET = 8.0  # Seconds when the caller gives no deadline
+HTTP_ATTEMPT_TIMEOUT = 4.0
+HTTP_ASYNC_WORKERS = 4
+
+# Content Prefetch
+PREFETCH_SIZE = 3  # Ready items per content source
+PREFETCH_RECENT = 50  # Served items remembered to avoid repeats
+PREFETCH_FETCH_BUDGET = 10.0  # Seconds per background fetch
+PREFETCH_MAX_BACKOFF = 300  # Seconds between retries while a source is down
+
 # Paths
 BASE_DIR = Path(__file__).parent.parent
-REMINDERS_FILE = BASE_DIR / "data" / "reminders.json"
+REMINDERS_FILE = BASE_DIR / "data" / "reminders.json"  # Legacy, imported into REMINDERS_DB
+REMINDERS_DB = BASE_DIR / "data" / "reminders.db"
+INTENT_CACHE_FILE = BASE_DIR / "data" / "intent_cache.json"
+METRICS_PROM_FILE = BASE_DIR / "data" / "metrics.prom"  # For node_exporter's textfile collector
+METRICS_JSONL_FILE = BASE_DIR / "data" / "metrics.jsonl"
+TTS_CACHE_DIR = BASE_DIR / "data" / "tts_cache"
+WEATHER_CITIES_FILE = BASE_DIR / "data" / "weather_cities.json"
+DICTIONARY_FILE = BASE_DIR / "data" / "dictionary.bin"
+DICTIONARY_PENDING_FILE = BASE_DIR / "data" / "dictionary_pending.jsonl"
+DEFINE_MAX_SENSES = 2  # Definitions read out per word
+
+# Weather Cache
+WEATHER_FRESH_SECONDS = 600  # Served without a refresh
+WEATHER_MAX_STALE_SECONDS = 3 * 3600  # Served while refreshing in the background
+WEATHER_BAD_CITY_SECONDS = 24 * 3600  # Unknown city names fail fast for this long
+WEATHER_PREFETCH_INTERVAL = 300
+WEATHER_PREFETCH_CITIES = 3  # Most requested cities kept warm
+
+# Speech Synthesis
+TTS_ENGINE = "gtts"
+TTS_LANG = "en"
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+TTS_CACHE_MAX_TEXT = 120  # Longer responses are rarely repeated, so skip the cache
+TTS_STREAM_MIN_CHARS = 120  # Longer responses are synthesized sentence by sentence
+TTS_STREAM_CHUNK_CHARS = 150
+TTS_STREAM_WORKERS = 3
+TTS_PREWARM_PHRASES = [
+    "Nex session started",
+    "Voice system initialized",
+    "Audio test successful",
+    "Timer done.",
+    "I couldn't get a joke right now.",
+    "I don't know how to answer that, but I'm here.",
+]
+# Responses starting with one of these are spoken as prefix + remainder so
+# the prefix clip is shared between responses
+TTS_FRAGMENT_PREFIXES = [
+    "The time is", "Today is", "The answer is", "Timer set for",
+    "Reminder set:", "Opening", "Searching for", "Playing",
+]
+
+# Intent Cache
+INTENT_CACHE_SIZE = 512
+INTENT_CACHE_DEFAULT_TTL = 24 * 3600  # Seconds
+INTENT_CACHE_TTLS = {  # None = never expires, 0 = never cached
+    "time": None,
+    "date": None,
+    "joke": None,
+    "reminder_set": 0,
+    "reminder_list": 0,
+    "timer": 0,
+    "timer_list": 0,
+    "timer_cancel": 0,
+    "system_control": 0,
+    "unknown": 0,
+}
+
+# Rule matches at or above this confidence skip the LLM
+RULE_CONFIDENCE_THRESHOLD = 0.85
+
+# Intent Detection
+GROQ_TIMEOUT = 10.0  # Seconds per Groq request
+INTENT_DEADLINE = 1.5  # Seconds to wait for Groq before answering from local rules
+INTENT_LLM_WORKERS = 8  # Concurrent Groq intent requests, hedges included
+INTENT_HEDGE = True  # Send a second Groq request once the first passes the p95 latency
+INTENT_HEDGE_MIN_SAMPLES = 20  # Latencies needed before hedging starts
+INTENT_STREAM = True  # Parse Groq's answer as it streams in
+INTENT_EARLY_DISPATCH = {"time", "date", "joke", "small_talk"}  # Acted on as soon as the intent is streamed
+
+# Batch intent detection
+BATCH_WORKERS = 8  # Utterances in flight at once
+BATCH_LLM_WAIT = 120.0  # Seconds a batch call may queue for the Groq rate limit
+
+# LLM Gateway
+GROQ_MODEL = "llama-3.1-8b-instant"
+GROQ_REQUESTS_PER_MINUTE = 30  # Client-side limits, corrected from Groq's rate-limit headers
+GROQ_TOKENS_PER_MINUTE = 6000
+LLM_BREAKER_FAILURES = 5  # Consecutive failures before Groq calls are paused
+LLM_BREAKER_COOLDOWN = 30  # Seconds before a paused gateway tries Groq again
+
+# Headless server (server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_WORKERS = 8  # Chat sessions handled concurrently
+SERVER_MAX_CLIENTS = 256
+SERVER_MAX_IN_FLIGHT = 128  # Commands waiting for an answer across all sessions
+SERVER_REQUEST_TIMEOUT = 30.0
+
+# Action execution
+# Each class has its own threads, so slow lookups never hold up timers or the clock
+ACTION_CLASSES = {"realtime": 4, "network": 4, "slow": 2, "compute": 2}
+ACTION_POLICIES = {  # intent -> (class, timeout in seconds)
+    "time": ("realtime", 1.0),
+    "date": ("realtime", 1.0),
+    "timer": ("realtime", 2.0),
+    "timer_list": ("realtime", 2.0),
+    "timer_cancel": ("realtime", 2.0),
+    "reminder_set": ("realtime", 2.0),
+    "reminder_list": ("realtime", 2.0),
+    "system_control": ("realtime", 3.0),
+    "small_talk": ("realtime", 1.0),
+    "weather": ("network", 8.0),
+    "joke": ("network", 6.0),
+    "search": ("network", 3.0),
+    "open_site": ("network", 3.0),
+    "play_music": ("network", 3.0),
+    "define": ("slow", 6.0),
+    "calculate": ("compute", 2.0),
+}
+ACTION_DEFAULT_POLICY = ("network", 8.0)
+ACTION_PROCESS_POOL = True  # Run the compute class in worker processes that can be killed
+ACTION_PROCESS_WORKERS = 2
+
+# Calculator
+CALC_MAX_OPERATIONS = 64  # Operators, calls and operands in one expression
+CALC_MAX_DIGITS = 100  # Largest intermediate result, in decimal digits
+CALC_CACHE_SIZE = 256  # Compiled expressions kept
+
+# Tracing
+METRICS_EXPORT_INTERVAL = 60  # Seconds between metric exports
+TRACE_MAX_OPEN = 256  # Unfinished traces kept before the oldest is dropped
 
 # Create data directory
 BASE_DIR.joinpath("data").mkdir(exist_ok=True)
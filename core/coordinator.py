@@ -1,47 +1,86 @@
 # core/coordinator.py
+import threading
+import time
 from core.event_bus import EventBus, Event, EventType
+from core.tracing import tracer
 from core.intent_processor import IntentProcessor
 from services.action_service import ActionService
-from services.speech_service import SpeechService
+from services.audio_output import PRIORITY_ALARM
+from config.settings import EVENT_QUEUE_SIZE
 
 class Coordinator:
-    def __init__(self, event_bus: EventBus):
+    def __init__(self, event_bus: EventBus, chat_workers: int = 1):
         self.event_bus = event_bus
         self.intent_processor = IntentProcessor()
         self.action_service = ActionService()
-        self.speech_service = SpeechService()
+        # trace_id -> (source, session) of each action being executed
+        self._running = {}
+        self._running_lock = threading.Lock()
+        
+        # Network-bound stages run off the publisher's thread. One worker per
+        # input channel keeps each channel in order while voice and chat
+        # proceed concurrently; speech gets its own worker so it never
+        # blocks intent handling. Chat sessions (server clients) are
+        # partitioned across chat_workers, each session staying in order.
+        self.event_bus.bind(EventType.VOICE_INPUT, workers=1, max_queue=EVENT_QUEUE_SIZE)
+        self.event_bus.bind(
+            EventType.CHAT_INPUT, workers=chat_workers, max_queue=EVENT_QUEUE_SIZE,
+            key=lambda event: event.data.get("session") or event.source,
+        )
+        self.event_bus.bind(EventType.SPEAK_RESPONSE, workers=1, max_queue=EVENT_QUEUE_SIZE)
         
         # Subscribe to events
         self.event_bus.subscribe(EventType.VOICE_INPUT, self._handle_voice_input)
         self.event_bus.subscribe(EventType.CHAT_INPUT, self._handle_chat_input)
         self.event_bus.subscribe(EventType.INTENT_DETECTED, self._handle_intent)
+        self.event_bus.subscribe(EventType.REMINDER_DUE, self._handle_reminder_due)
+        self.event_bus.subscribe(EventType.TIMER_DONE, self._handle_timer_done)
+        # Not bound: cancels run on the publisher's thread, never queued
+        # behind the command they cancel
+        self.event_bus.subscribe(EventType.CANCEL_REQUEST, self._handle_cancel)
     
     def start(self):
-        """Initialize services"""
-        self.speech_service.initialize()
+        """Start background services; audio is started by the front end"""
+        self.action_service.start()
+    
+    def shutdown(self):
+        """Flush persistent state"""
+        self.action_service.shutdown()
+        self.intent_processor.shutdown()
     
     def _handle_voice_input(self, event: Event):
         """Process voice input and trigger intent detection"""
         text = event.data.get("text", "")
         if not text:
+            tracer.discard(event.trace_id)
             return
         
-        intent_result = self.intent_processor.detect(text)
+        tracer.record("queue", time.monotonic() - event.timestamp, event.trace_id)
+        with tracer.span("intent", event.trace_id):
+            intent_result = self.intent_processor.detect(text)
         self.event_bus.publish(Event(
             EventType.INTENT_DETECTED,
-            {"intent": intent_result, "source": "voice", "original_text": text}
+            {"intent": intent_result, "source": "voice", "original_text": text},
+            trace_id=event.trace_id,
         ))
     
     def _handle_chat_input(self, event: Event):
         """Process chat input and trigger intent detection"""
         text = event.data.get("text", "")
         if not text:
+            tracer.discard(event.trace_id)
             return
         
-        intent_result = self.intent_processor.detect(text)
+        # Typed commands start their trace when they are sent
+        tracer.begin(event.trace_id, at=event.timestamp)
+        tracer.record("queue", time.monotonic() - event.timestamp, event.trace_id)
+        with tracer.span("intent", event.trace_id):
+            intent_result = self.intent_processor.detect(text)
         self.event_bus.publish(Event(
             EventType.INTENT_DETECTED,
-            {"intent": intent_result, "source": "chat", "original_text": text}
+            {"intent": intent_result, "source": "chat", "original_text": text,
+             "session": event.data.get("session")},
+            trace_id=event.trace_id,
         ))
     
     def _handle_intent(self, event: Event):
@@ -49,17 +88,81 @@ class Coordinator:
         intent_data = event.data.get("intent", {})
         source = event.data.get("source", "unknown")
         
+        session = event.data.get("session")
+        
         # Execute action
-        response = self.action_service.execute(intent_data, source=source)
+        with self._running_lock:
+            self._running[event.trace_id] = (source, session)
+        try:
+            with tracer.span("action", event.trace_id):
+                response = self.action_service.execute(intent_data, source=source, trace_id=event.trace_id)
+        finally:
+            with self._running_lock:
+                self._running.pop(event.trace_id, None)
         
-        # Publish response based on source
+        self._respond(source, response, event.trace_id, session, event.data.get("original_text"))
+    
+    def _respond(self, source: str, text: str, trace_id: str, session=None, original_text=None):
+        """Publish a response based on source"""
         if source == "voice":
             self.event_bus.publish(Event(
                 EventType.SPEAK_RESPONSE,
-                {"text": response, "original_text": event.data.get("original_text")}
+                {"text": text, "original_text": original_text},
+                trace_id=trace_id,
             ))
         elif source == "chat":
+            # session routes the answer back to the server client that asked
             self.event_bus.publish(Event(
                 EventType.CHAT_RESPONSE,
-                {"text": response, "original_text": event.data.get("original_text")}
-            ))
\ No newline at end of file
+                {"text": text, "original_text": original_text, "session": session},
+                trace_id=trace_id,
+            ))
+    
+    def _handle_cancel(self, event: Event):
+        """Cancel one action by trace_id, or every action running for a source and session"""
+        trace_id = event.data.get("trace_id")
+        source = event.data.get("source")
+        session = event.data.get("session")
+        with self._running_lock:
+            if trace_id:
+                targets = [trace_id] if trace_id in self._running else []
+            else:
+                targets = [t for t, running in self._running.items() if running == (source, session)]
+        
+        # Each cancelled action answers "Cancelled." itself
+        cancelled = sum(self.action_service.cancel(t) for t in targets)
+        if not cancelled and not trace_id:
+            self._respond(source, "Nothing to cancel.", event.trace_id, session)
+    
+    def _handle_reminder_due(self, event: Event):
+        """Announce a reminder on both front ends"""
+        text = f"Reminder: {event.data.get('text')}"
+        self.event_bus.publish(Event(
+            EventType.SPEAK_RESPONSE,
+            {"text": text, "priority": PRIORITY_ALARM},
+            trace_id=event.trace_id,
+        ))
+        self.event_bus.publish(Event(
+            EventType.CHAT_RESPONSE,
+            {"text": text},
+            trace_id=event.trace_id,
+        ))
+    
+    def _handle_timer_done(self, event: Event):
+        """Sound a finished timer on both front ends"""
+        label = event.data.get("label", "Timer")
+        late_minutes = int(event.data.get("late", 0) // 60)
+        if late_minutes:
+            text = f"{label} finished {late_minutes} minutes ago."
+        else:
+            text = f"{label} done."
+        self.event_bus.publish(Event(
+            EventType.SPEAK_RESPONSE,
+            {"text": text, "priority": PRIORITY_ALARM},
+            trace_id=event.trace_id,
+        ))
+        self.event_bus.publish(Event(
+            EventType.CHAT_RESPONSE,
+            {"text": text},
+            trace_id=event.trace_id,
+        ))
\ No newline at end of file
@@ -1,7 +1,12 @@
 # core/event_bus.py
-from typing import Callable, Dict, List
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
 from threading import Lock
 from enum import Enum
+from core.tracing import new_trace_id
 
 class EventType(Enum):
     VOICE_INPUT = "voice_input"
@@ -10,33 +15,154 @@ class EventType(Enum):
     ACTION_RESPONSE = "action_response"
     SPEAK_RESPONSE = "speak_response"
     CHAT_RESPONSE = "chat_response"
+    REMINDER_DUE = "reminder_due"
+    TIMER_DONE = "timer_done"
+    CANCEL_REQUEST = "cancel_request"
 
 class Event:
-    def __init__(self, event_type: EventType, data: dict, source: str = None):
+    def __init__(self, event_type: EventType, data: dict, source: str = None, trace_id: str = None):
         self.type = event_type
         self.data = data
         self.source = source
+        # Events caused by another event carry its trace_id forward
+        self.trace_id = trace_id or new_trace_id()
+        self.timestamp = time.monotonic()
+
+class _Dispatcher:
+    """Worker pool with one bounded FIFO queue per worker.
+
+    Events are partitioned by key, so events sharing a key are handled in
+    publish order while different keys run concurrently.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int,
+                 put_timeout: Optional[float], key: Callable[[Event], object]):
+        self.put_timeout = put_timeout
+        self.key = key
+        self.queues = [queue.Queue(maxsize=max_queue) for _ in range(max(1, workers))]
+        self._stopped = threading.Event()
+        self.threads = []
+        for i, q in enumerate(self.queues):
+            t = threading.Thread(target=self._run, args=(q,), name=f"{name}-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def submit(self, event: Event, run: Callable[[Event], None], future: Future):
+        index = hash(self.key(event)) % len(self.queues)
+        # Blocks the publisher while the partition is full (backpressure)
+        self.queues[index].put((event, run, future), timeout=self.put_timeout)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self.queues)
+
+    def stop(self):
+        """Let workers finish what is queued, unless a queue is full"""
+        for q in self.queues:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                # Its worker is stuck on a slow handler: don't wait for room,
+                # stop every worker after its current event instead
+                self._stopped.set()
+        for t in self.threads:
+            t.join(timeout=1)
+
+    def _run(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            if self._stopped.is_set():
+                # Cancel what is left rather than run it
+                while item:
+                    item[2].cancel()
+                    try:
+                        item = q.get_nowait()
+                    except queue.Empty:
+                        return
+                return
+            event, run, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(run(event))
+            except Exception as e:
+                future.set_exception(e)
 
 class EventBus:
     def __init__(self):
         self._listeners: Dict[EventType, List[Callable]] = {}
+        self._dispatchers: Dict[EventType, _Dispatcher] = {}
         self._lock = Lock()
-    
+
     def subscribe(self, event_type: EventType, callback: Callable):
         with self._lock:
             if event_type not in self._listeners:
                 self._listeners[event_type] = []
             self._listeners[event_type].append(callback)
-    
+
+    def bind(self, event_type: EventType, workers: int = 1, max_queue: int = 32,
+             put_timeout: Optional[float] = None, key: Callable[[Event], object] = None):
+        """Dispatch an event type on its own worker pool instead of inline"""
+        dispatcher = _Dispatcher(
+            event_type.value, workers, max_queue, put_timeout,
+            key or (lambda event: event.source),
+        )
+        with self._lock:
+            previous = self._dispatchers.get(event_type)
+            self._dispatchers[event_type] = dispatcher
+        if previous:
+            previous.stop()
+
+    def queue_depth(self, event_type: EventType) -> int:
+        """Number of events waiting for a worker"""
+        with self._lock:
+            dispatcher = self._dispatchers.get(event_type)
+        return dispatcher.depth() if dispatcher else 0
+
     def publish(self, event: Event):
+        future = self.publish_async(event)
+        if future.done() and future.exception():
+            print(f"[EventBus] Dropped {event.type.value}: {future.exception()!r}")
+
+    def publish_async(self, event: Event) -> Future:
+        """Publish an event, returning a future that resolves once every listener has run"""
+        future = Future()
+        with self._lock:
+            dispatcher = self._dispatchers.get(event.type)
+
+        if dispatcher is None:
+            future.set_running_or_notify_cancel()
+            future.set_result(self._deliver(event))
+            return future
+
+        try:
+            dispatcher.submit(event, self._deliver, future)
+        except queue.Full:
+            future.set_running_or_notify_cancel()
+            future.set_exception(queue.Full(f"{event.type.value} queue is full"))
+        return future
+
+    def _deliver(self, event: Event) -> List[Exception]:
         with self._lock:
             listeners = self._listeners.get(event.type, []).copy()
-        
+
+        errors = []
         for callback in listeners:
             try:
                 callback(event)
             except Exception as e:
                 print(f"[EventBus] Error in callback {callback}: {e}")
+                errors.append(e)
+        return errors
+
+    def shutdown(self):
+        """Stop all worker pools"""
+        with self._lock:
+            dispatchers = list(self._dispatchers.values())
+            self._dispatchers.clear()
+        for dispatcher in dispatchers:
+            dispatcher.stop()
 
 # Global event bus instance
 event_bus = EventBus()
\ No newline at end of file
@@ -0,0 +1,137 @@
+# core/intent_cache.py
+import json
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+from config.settings import WAKE_WORDS, DEBUG
+
+# Only dropped at either end of an utterance, never from the middle
+FILLER_WORDS = {"please", "um", "uh", "erm", "hmm"}
+
+# Bumped whenever normalize_utterance changes, so keys saved by an older
+# version are not loaded and matched against differently normalized text
+KEY_VERSION = 2
+
+# Keeps the arithmetic characters intent_rules.clean_utterance keeps, so
+# "(2+3) times 4" and "2+3 times 4" stay different keys
+_PUNCTUATION = re.compile(r"[^\w\s+\-*/.%^()]")
+
+def normalize_utterance(text: str) -> str:
+    """Canonical cache key: lowercase, no punctuation, a leading wake word and
+    fillers at either end removed"""
+    t = _PUNCTUATION.sub(" ", text.lower())
+    words = [w for w in (w.strip(".") for w in t.split()) if w]
+    while words:
+        if words[0] in FILLER_WORDS or words[0] in WAKE_WORDS:
+            words.pop(0)
+        elif len(words) > 1 and words[0] in ("hey", "ok", "okay") and words[1] in WAKE_WORDS:
+            words.pop(0)
+        else:
+            break
+    while words and words[-1] in FILLER_WORDS:
+        words.pop()
+    return " ".join(words)
+
+class IntentCache:
+    """LRU cache of detected intents keyed on the normalized utterance.
+
+    ttls maps an intent name to its lifetime in seconds: None never
+    expires, 0 disables caching for that intent.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 512,
+                 ttls: Dict[str, Optional[float]] = None, default_ttl: Optional[float] = 86400,
+                 save_every: int = 10):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._dirty = 0
+        self._lock = Lock()
+        self._load()
+
+    def get(self, text: str) -> Optional[dict]:
+        key = normalize_utterance(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires"] is not None and entry["expires"] < time.time():
+                del self._entries[key]
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(json.dumps(entry["result"]))
+
+    def put(self, text: str, result: dict):
+        key = normalize_utterance(text)
+        ttl = self.ttls.get(result.get("intent"), self.default_ttl)
+        if not key or ttl == 0:
+            return
+
+        with self._lock:
+            self._entries[key] = {
+                "result": result,
+                "expires": None if ttl is None else time.time() + ttl,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty += 1
+            flush = self._dirty >= self.save_every
+
+        if flush:
+            self.save()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def save(self):
+        """Persist live entries to disk"""
+        if not self.path:
+            return
+        with self._lock:
+            now = time.time()
+            entries = [[k, v] for k, v in self._entries.items()
+                       if v["expires"] is None or v["expires"] > now]
+            self._dirty = 0
+        try:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": KEY_VERSION, "entries": entries}))
+            tmp.replace(self.path)
+        except Exception as e:
+            print(f"[IntentCache] Failed to save cache: {e}")
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            saved = json.loads(self.path.read_text())
+            if not isinstance(saved, dict) or saved.get("version") != KEY_VERSION:
+                if DEBUG:
+                    print("[IntentCache] Discarding cache saved with older keys")
+                return
+            now = time.time()
+            for key, entry in saved["entries"]:
+                if entry["expires"] is None or entry["expires"] > now:
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if DEBUG:
+                print(f"[IntentCache] Loaded {len(self._entries)} cached intents")
+        except Exception as e:
+            print(f"[IntentCache] Ignoring unreadable cache file: {e}")
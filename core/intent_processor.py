@@ -1,124 +1,259 @@
 # core/intent_processor.py
+import argparse
 import json
-from groq import Groq
-from config.settings import GROQ_API_KEY, DEBUG
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from itertools import tee
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+from config.settings import (
+    DEBUG, GROQ_TIMEOUT, BATCH_WORKERS, BATCH_LLM_WAIT, INTENT_CACHE_FILE, INTENT_CACHE_SIZE,
+    INTENT_CACHE_DEFAULT_TTL, INTENT_CACHE_TTLS, RULE_CONFIDENCE_THRESHOLD,
+    INTENT_DEADLINE, INTENT_LLM_WORKERS, INTENT_HEDGE, INTENT_HEDGE_MIN_SAMPLES, INTENT_STREAM, INTENT_EARLY_DISPATCH,
+)
+from core.intent_cache import IntentCache
+from core.intent_rules import RuleMatcher
+from core.tracing import percentile
+from services.llm_gateway import llm_gateway
 
 class IntentProcessor:
-    def __init__(self):
-        self.client = Groq(api_key=GROQ_API_KEY)
-        self.system_prompt = """You are Nex's intent extraction agent. Return ONLY a JSON object with this exact format:
-{
-  "intent": "weather|time|date|reminder_set|reminder_list|timer|joke|search|open_site|play_music|define|calculate|system_control|small_talk|unknown",
-  "slots": {"city": "...", "query": "...", "song": "...", "word": "...", "expr": "...", "amount": "...", "unit": "...", "datetime": "...", "target": "..."}
-}
-Extract any slots from the user's message. Do not include any commentary or markdown."""
+    def __init__(self, cache_file: Optional[Path] = INTENT_CACHE_FILE):
+        # cache_file=None keeps the cache in memory only
+        self.cache = IntentCache(
+            cache_file,
+            max_entries=INTENT_CACHE_SIZE,
+            ttls=INTENT_CACHE_TTLS,
+            default_ttl=INTENT_CACHE_DEFAULT_TTL,
+        )
+        self.rules = RuleMatcher()
+        
+        # Groq calls run here so detect() can stop waiting at its deadline
+        self._llm_pool = ThreadPoolExecutor(max_workers=INTENT_LLM_WORKERS, thread_name_prefix="intent-llm")
+        self._llm_latencies = deque(maxlen=200)
+        self.outcomes = Counter()
+        self._stats_lock = threading.Lock()
     
-    def detect(self, text: str) -> dict:
-        """Detect intent using Groq with robust fallback"""
+    def detect(self, text: str, deadline: Optional[float] = None, interactive: bool = True) -> dict:
+        """Detect intent, answering locally if Groq misses the deadline.
+        
+        Non-interactive callers (batch runs) have no deadline: they wait for
+        Groq, including its rate limit, and are never hedged.
+        """
         if not text:
             return {"intent": "unknown", "slots": {}}
         
-        try:
-            # Try Groq first
-            response = self.client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=150,
-                temperature=0.1,
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Clean up response (remove markdown if present)
-            content = content.replace("```json", "").replace("```", "").strip()
-            
-            parsed = json.loads(content)
-            
-            # Validate structure
-            if "intent" in parsed and "slots" in parsed:
-                if DEBUG:
-                    print(f"[IntentProcessor] Detected: {parsed}")
-                return parsed
-            
-        except json.JSONDecodeError as e:
+        # Unambiguous commands never need the LLM
+        matched = self.rules.match(text)
+        if matched and matched[1] >= RULE_CONFIDENCE_THRESHOLD:
             if DEBUG:
-                print(f"[IntentProcessor] JSON parse error: {e}")
-                print(f"[IntentProcessor] Raw content: {content}")
-        except Exception as e:
+                print(f"[IntentProcessor] Rule match ({matched[1]}): {matched[0]}")
+            self._record("rule")
+            return matched[0]
+        
+        cached = self.cache.get(text)
+        if cached:
             if DEBUG:
-                print(f"[IntentProcessor] Groq error: {e}")
+                print(f"[IntentProcessor] Cache hit: {cached} {self.cache.stats()}")
+            self._record("cache")
+            return cached
+        
+        if interactive:
+            parsed, path = self._hedged_llm(text, deadline or time.monotonic() + INTENT_DEADLINE)
+        else:
+            parsed = self._llm_detect(text, True, wait=BATCH_LLM_WAIT)
+            path = "llm" if parsed else "llm_error"
+            if parsed:
+                self.cache.put(text, parsed)
+        self._record(path)
+        if parsed:
+            return parsed
         
         # Fallback to keyword matching
         if DEBUG:
-            print("[IntentProcessor] Falling back to keywords")
+            print(f"[IntentProcessor] Falling back to keywords ({path})")
         return self._keyword_fallback(text)
     
-    def _keyword_fallback(self, text: str) -> dict:
-        """Simple keyword-based intent detection"""
-        t = text.lower()
-        
-        # Weather
-        if any(word in t for word in ["weather", "temperature", "temp", "forecast", "rain", "snow"]):
-            city = self._extract_after(t, "in")
-            return {"intent": "weather", "slots": {"city": city}}
-        
-        # Time
-        if any(word in t for word in ["time", "what time", "clock"]):
-            return {"intent": "time", "slots": {}}
-        
-        # Date
-        if any(word in t for word in ["date", "what day", "today", "day is it"]):
-            return {"intent": "date", "slots": {}}
-        
-        # Joke
-        if "joke" in t:
-            return {"intent": "joke", "slots": {}}
+    def detect_many(self, texts: Iterable[str], workers: int = BATCH_WORKERS,
+                    progress: Optional[Callable[[int, float], None]] = None) -> Iterator[dict]:
+        """Detect intents for many utterances, yielding results in input order.
         
-        # Search
-        if any(word in t for word in ["search", "look up", "find"]):
-            query = text.replace("search", "").replace("look up", "").strip()
-            return {"intent": "search", "slots": {"query": query}}
-        
-        # Open site
-        if any(word in t for word in ["open", "go to"]):
-            target = text.replace("open", "").replace("go to", "").strip()
-            return {"intent": "open_site", "slots": {"target": target}}
-        
-        # Play music
-        if any(word in t for word in ["play", "song", "music"]):
-            song = text.replace("play", "").strip()
-            return {"intent": "play_music", "slots": {"song": song}}
-        
-        # Define
-        if any(word in t for word in ["define", "definition", "what does"]):
-            word = text.replace("define", "").strip()
-            return {"intent": "define", "slots": {"word": word}}
-        
-        # Calculate
-        if any(char in t for char in ["+", "-", "*", "/"]) or "calculate" in t:
-            expr = text.replace("calculate", "").strip()
-            return {"intent": "calculate", "slots": {"expr": expr}}
+        At most workers utterances are in flight; texts may be a lazy
+        iterable such as an open file. progress(done, elapsed) is called
+        after each result.
+        """
+        start = time.monotonic()
+        done = 0
+        window = deque()
+        texts = iter(texts)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="intent-batch") as pool:
+            for text in texts:
+                window.append(pool.submit(self.detect, text, interactive=False))
+                if len(window) < workers:
+                    continue
+                yield window.popleft().result()
+                done += 1
+                if progress:
+                    progress(done, time.monotonic() - start)
+            while window:
+                yield window.popleft().result()
+                done += 1
+                if progress:
+                    progress(done, time.monotonic() - start)
+    
+    def detect_batch(self, texts: Iterable[str], workers: int = BATCH_WORKERS,
+                     progress: Optional[Callable[[int, float], None]] = None) -> List[dict]:
+        """detect_many collected into a list"""
+        return list(self.detect_many(texts, workers, progress))
+    
+    def stats(self) -> dict:
+        """Which path answered, and the LLM latency the deadline is tuned against"""
+        with self._stats_lock:
+            latencies = list(self._llm_latencies)
+            outcomes = dict(self.outcomes)
+        return {
+            "outcomes": outcomes,
+            "llm_p50": percentile(latencies, 0.5),
+            "llm_p95": percentile(latencies, 0.95),
+            "gateway": llm_gateway.stats(),
+        }
+    
+    def shutdown(self):
+        """Persist the intent cache"""
+        self.cache.save()
+        self._llm_pool.shutdown(wait=False)
+    
+    def _hedged_llm(self, text: str, deadline: float):
+        """Groq answer and the path that produced it ("llm", "hedge", "deadline" or "llm_error")"""
+        pending = {self._llm_pool.submit(self._llm_detect, text, True): "llm"}
+        hedge_at = None
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None:
+            hedge_at = time.monotonic() + hedge_delay
         
-        # Reminder
-        if "remind" in t:
-            return {"intent": "reminder_set", "slots": {}}
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            until = deadline if hedge_at is None else min(deadline, hedge_at)
+            done, _ = wait(pending, timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                path = pending.pop(future)
+                parsed = future.result()
+                if parsed:
+                    self.cache.put(text, parsed)
+                    return parsed, path
+            
+            # Slow first attempt: race a second request against it
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                # Not coalesced, or it would just wait on the first request
+                pending[self._llm_pool.submit(self._llm_detect, text, False)] = "hedge"
         
-        # Timer
-        if "timer" in t:
-            return {"intent": "timer", "slots": {}}
+        if not pending:
+            return None, "llm_error"
         
-        # Small talk
-        if any(word in t for word in ["hello", "hi", "hey", "how are you"]):
-            return {"intent": "small_talk", "slots": {}}
+        # Keep late answers so the next identical request is a cache hit
+        for future in pending:
+            future.add_done_callback(lambda f: f.result() and self.cache.put(text, f.result()))
+        return None, "deadline"
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """p95 of recent Groq latencies, once there are enough samples"""
+        if not INTENT_HEDGE:
+            return None
+        with self._stats_lock:
+            if len(self._llm_latencies) < INTENT_HEDGE_MIN_SAMPLES:
+                return None
+            latencies = sorted(self._llm_latencies)
+        return latencies[int(len(latencies) * 0.95)]
+    
+    def _llm_detect(self, text: str, coalesce: bool, wait: Optional[float] = None) -> Optional[dict]:
+        """One Groq round trip through the gateway; None on any failure.
         
-        return {"intent": "unknown", "slots": {}}
+        wait overrides how long to queue for the rate limit; such calls are
+        left out of the latencies the hedge is tuned on.
+        """
+        start = time.monotonic()
+        if INTENT_STREAM:
+            # Slot-less intents come back after the first few tokens
+            parsed = llm_gateway.stream_intent(
+                text, early=INTENT_EARLY_DISPATCH, coalesce=coalesce, wait=wait or GROQ_TIMEOUT,
+            )
+        else:
+            parsed = llm_gateway.extract_intent(text, coalesce=coalesce, wait=wait or GROQ_TIMEOUT)
+        if parsed:
+            if parsed["intent"] == "small_talk" and not parsed["slots"].get("text"):
+                parsed["slots"]["text"] = text
+            if wait is None:
+                with self._stats_lock:
+                    self._llm_latencies.append(time.monotonic() - start)
+            if DEBUG:
+                print(f"[IntentProcessor] Detected: {parsed}")
+        return parsed
     
-    def _extract_after(self, text: str, keyword: str) -> str:
-        """Extract text after a keyword"""
-        parts = text.split(keyword)
-        if len(parts) > 1:
-            return parts[1].strip()
-        return ""
\ No newline at end of file
+    def _record(self, path: str):
+        with self._stats_lock:
+            self.outcomes[path] += 1
+        if DEBUG:
+            print(f"[IntentProcessor] Answered by {path}: {dict(self.outcomes)}")
+    
+    def _keyword_fallback(self, text: str) -> dict:
+        """Best rule match at any confidence"""
+        matched = self.rules.match(text)
+        if matched:
+            return matched[0]
+        return {"intent": "unknown", "slots": {}}
+
+def _read_utterances(path: Path) -> Iterator[str]:
+    """Plain lines, or JSONL with a "text" field per line"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("{"):
+                try:
+                    line = json.loads(line).get("text", "")
+                except ValueError:
+                    pass
+            if line:
+                yield line
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Detect intents for a file of utterances")
+    parser.add_argument("utterances", type=Path, help="one utterance per line, or JSONL with a text field")
+    parser.add_argument("--out", type=Path, help="JSONL output (default: stdout)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args(argv)
+
+    def report(done: int, elapsed: float):
+        if done % 25 == 0:
+            print(f"\r{done} utterances, {done / elapsed:.1f}/s", end="", file=sys.stderr, flush=True)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    start = time.monotonic()
+    count = 0
+    # Debug output goes to stderr so it never mixes with the records, and
+    # the replay neither reads nor updates the assistant's intent cache
+    with redirect_stdout(sys.stderr):
+        processor = IntentProcessor(cache_file=None)
+        try:
+            # tee keeps only the utterances still in flight
+            texts, feed = tee(_read_utterances(args.utterances))
+            for text, result in zip(texts, processor.detect_many(feed, args.workers, report)):
+                out.write(json.dumps({"text": text, **result}) + "\n")
+                count += 1
+        finally:
+            if args.out:
+                out.close()
+            processor.shutdown()
+
+    elapsed = time.monotonic() - start
+    print(f"\r{count} utterances in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.1f}/s)", file=sys.stderr)
+    print(json.dumps(processor.stats()), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# core/intent_rules.py
+import re
+from typing import List, NamedTuple, Optional, Tuple
+from config.settings import WAKE_WORDS
+
+class Rule(NamedTuple):
+    intent: str
+    confidence: float
+    pattern: str
+
+_UNIT = r"(?:seconds?|secs?|minutes?|mins?|hours?|hrs?)"
+_EXPR = r"[\d.]+(?: ?(?:[-+*/x%^]|\*\*) ?\(* ?[\d.]+ ?\)*)+"
+# Words that qualify a forecast rather than name a place; a city stops before them
+_WHEN = r"(?:today|tonight|tomorrow|now|right now|later|this \w+|next \w+|(?:on |at |over )?the weekend|in (?:celsius|fahrenheit|metric|imperial))\b"
+_CITY = rf"(?!{_WHEN})[a-z][a-z.\-]*(?: (?!{_WHEN})[a-z][a-z.\-]*)*"
+# "play it again" names no song, so it is left to the LLM
+_NO_SONG = r"(?:it|that|this|something|anything|some music|music)(?: again| now)?$"
+
+# Anchored rules describe a whole utterance and are trusted enough to skip
+# the LLM. Unanchored keyword rules only serve as the offline fallback.
+RULES: List[Rule] = [
+    Rule("time", 0.95, r"^(?:what s |what is )?(?:the )?(?:current )?time(?: is it)?(?: now| right now)?$"),
+    Rule("time", 0.95, r"^what time is it(?: now| right now)?$"),
+    Rule("date", 0.95, r"^(?:what s |what is )?(?:the |today s )?date(?: today)?$"),
+    Rule("date", 0.95, r"^what day is (?:it|today)(?: today)?$"),
+    Rule("joke", 0.95, r"^(?:tell me )?(?:a |another )?(?:funny )?joke$"),
+    Rule("timer", 0.95, rf"^(?:set )?(?:a )?timer for (?P<amount>\d+) (?P<unit>{_UNIT})$"),
+    Rule("timer", 0.95, rf"^(?:set )?(?:a )?(?P<amount>\d+) (?P<unit>{_UNIT}) timer$"),
+    Rule("timer", 0.95, rf"^(?:set )?(?:a |an )?(?P<label>[a-z]+) timer for (?P<amount>\d+) (?P<unit>{_UNIT})$"),
+    Rule("timer_cancel", 0.95, r"^(?:cancel|stop|delete) (?:the |my )?(?:(?P<label>[a-z]+) )?timer$"),
+    Rule("timer_list", 0.95, r"^(?:list|show)(?: me)? (?:all )?(?:my |the )?timers$"),
+    Rule("timer_list", 0.95, r"^(?:what|which) timers (?:are|do i have)(?: running| set)?$"),
+    Rule("system_control", 0.95, r"^(?:open |launch |start )(?P<target>calculator|terminal|console|vs ?code|code)$"),
+    Rule("system_control", 0.9, r"^(?P<target>exit|quit|goodbye)$"),
+    Rule("open_site", 0.9, r"^(?:open|go to|launch) (?P<target>[a-z0-9][\w.\-]*(?:\.[a-z]{2,})?)$"),
+    Rule("weather", 0.9, rf"^(?:what s |what is |how s |how is )?(?:the )?(?:weather|temperature|forecast)(?: like)? (?:in|for) (?P<city>{_CITY})(?: today| now| right now)?$"),
+    Rule("calculate", 0.9, rf"^(?:calculate |compute |what s |what is )?(?P<expr>\(* ?{_EXPR})$"),
+    Rule("calculate", 0.9, r"^convert (?P<amount>[\d.]+) ?(?P<unit>[a-z][a-z/ ]*? (?:to|in|into) [a-z][a-z/ ]*)$"),
+    Rule("define", 0.9, r"^(?:define|definition of|meaning of) (?P<word>[a-z\-]+)$"),
+    Rule("define", 0.9, r"^what does (?P<word>[a-z\-]+) mean$"),
+    Rule("search", 0.85, r"^(?:search for|search|look up|google) (?P<query>.+)$"),
+    Rule("play_music", 0.85, rf"^play (?!{_NO_SONG})(?P<song>.+)$"),
+    Rule("reminder_list", 0.9, r"^(?:list|show|read)(?: me)? (?:all )?my reminders$"),
+    Rule("reminder_list", 0.9, r"^what are my reminders$"),
+    Rule("small_talk", 0.9, r"^(?P<text>(?:hello|hi|hey|good (?:morning|afternoon|evening))(?: there)?)$"),
+    Rule("small_talk", 0.9, r"^(?P<text>how are (?:you|things)(?: doing)?(?: today)?)$"),
+
+    Rule("weather", 0.6, rf"\b(?:weather|temperature|temp|forecast|rain|snow)\b(?:.*?\bin (?P<city>{_CITY}))?"),
+    Rule("calculate", 0.6, rf"\bcalculate (?P<expr>.+)|(?P<bare>{_EXPR})"),
+    Rule("time", 0.5, r"\b(?:what time|time|clock)\b"),
+    Rule("date", 0.5, r"\b(?:date|what day|today|day is it)\b"),
+    Rule("joke", 0.5, r"\bjokes?\b"),
+    Rule("search", 0.5, r"\b(?:search(?: for)?|look up|find) (?P<query>.+)"),
+    Rule("open_site", 0.5, r"\b(?:open|go to) (?P<target>.+)"),
+    Rule("play_music", 0.5, r"\bplay (?P<song>.+)|\b(?:song|music)\b"),
+    Rule("define", 0.5, r"\b(?:define|definition of) (?P<word>[a-z\-]+)|\bwhat does\b"),
+    Rule("reminder_set", 0.5, r"\bremind(?:er)?\b"),
+    Rule("timer", 0.5, rf"\btimer\b(?:.*?(?P<amount>\d+) (?P<unit>{_UNIT}))?"),
+    Rule("small_talk", 0.5, r"\b(?P<text>hello|hi|hey|how are you)\b"),
+]
+
+_PUNCTUATION = re.compile(r"[^\w\s+\-*/.%^()]")
+
+def clean_utterance(text: str) -> str:
+    """Lowercase, strip punctuation, a leading wake word and trailing please"""
+    words = [w.rstrip(".") for w in _PUNCTUATION.sub(" ", text.lower()).split()]
+    if len(words) > 1 and words[0] in ("hey", "ok", "okay") and words[1] in WAKE_WORDS:
+        words.pop(0)
+    while words and words[0] in WAKE_WORDS:
+        words.pop(0)
+    while words and words[-1] == "please":
+        words.pop()
+    return " ".join(w for w in words if w)
+
+# Said or typed while a command is still running, these cancel it
+CANCEL_PHRASES = {"cancel", "cancel that", "never mind", "nevermind", "forget it", "stop", "stop that"}
+
+def is_cancel_command(text: str) -> bool:
+    return clean_utterance(text) in CANCEL_PHRASES
+
+class RuleMatcher:
+    """All rules compiled into one alternation, tried in confidence order"""
+
+    def __init__(self, rules: List[Rule] = None):
+        self._rules = sorted(rules or RULES, key=lambda r: -r.confidence)
+        parts = []
+        for i, rule in enumerate(self._rules):
+            # Group names must be unique across the combined pattern
+            pattern = re.sub(r"\(\?P<(\w+)>", rf"(?P<r{i}_\1>", rule.pattern)
+            parts.append(f"(?P<r{i}>{pattern})")
+        self._regex = re.compile("|".join(parts))
+
+    def match(self, text: str) -> Optional[Tuple[dict, float]]:
+        """Best matching intent and its confidence, or None"""
+        t = clean_utterance(text)
+        best = None
+        for m in self._regex.finditer(t):
+            index = int(m.lastgroup[1:])
+            if best is None or self._rules[index].confidence > self._rules[best[0]].confidence:
+                best = (index, m)
+
+        if best is None:
+            return None
+
+        index, m = best
+        rule = self._rules[index]
+        prefix = f"r{index}_"
+        slots = {}
+        for name, value in m.groupdict().items():
+            if value and name.startswith(prefix):
+                slots[name[len(prefix):]] = value.strip()
+        if "bare" in slots:
+            slots["expr"] = slots.pop("bare")
+        return {"intent": rule.intent, "slots": slots}, rule.confidence
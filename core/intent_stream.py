@@ -0,0 +1,82 @@
+# core/intent_stream.py
+import json
+from typing import Optional
+
+class IntentStreamParser:
+    """Incremental reader for the intent JSON as Groq streams it.
+
+    Only tracks what early dispatch needs: the top-level "intent" value,
+    known as soon as its closing quote arrives, and the end of the outer
+    object. Anything before the first brace or after the last one, such
+    as a markdown fence, is ignored.
+    """
+
+    def __init__(self):
+        self.intent: Optional[str] = None
+        self.done = False
+        self._text = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token = []
+        self._key = None
+        self._expect_value = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume a chunk; returns the intent if this chunk completed it"""
+        found = None
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._depth:
+                if ch == "{":
+                    self._depth = 1
+                    self._text.append(ch)
+                continue
+            self._text.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    found = self._string_done() or found
+                    continue
+                self._token.append(ch)
+            elif ch == '"':
+                self._in_string = True
+                self._token = []
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                self.done = self._depth == 0
+            elif self._depth == 1 and ch == ":":
+                self._expect_value = True
+            elif self._depth == 1 and ch == ",":
+                self._key, self._expect_value = None, False
+        return found
+
+    def result(self) -> Optional[dict]:
+        """The whole object once it has closed"""
+        if not self.done:
+            return None
+        return json.loads("".join(self._text))
+
+    def _string_done(self) -> Optional[str]:
+        if self._depth != 1:
+            return None
+        try:
+            value = json.loads('"' + "".join(self._token) + '"')
+        except ValueError:
+            value = "".join(self._token)
+        if not self._expect_value:
+            self._key = value
+            return None
+        self._expect_value = False
+        if self._key == "intent" and self.intent is None:
+            self.intent = value
+            return value
+        return None
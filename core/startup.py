@@ -0,0 +1,47 @@
+# core/startup.py
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+class StartupTimeline:
+    """Offsets and durations of startup steps, relative to process start.
+
+    Most steps are phases that group several imports or constructors.
+    Heavy imports deferred to first use (groq, speech_service with pygame,
+    gTTS and speech_recognition) are timed as their own "import ..." steps,
+    nested inside whichever phase first needs them. Steps may run on
+    several threads at once; each is reported with the thread it ran on.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self._steps: List[Tuple[str, str, float, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._steps.append((name, threading.current_thread().name, start - self.origin, end - start))
+
+    def mark(self, name: str):
+        """A zero-length step, such as the window becoming ready"""
+        with self._lock:
+            now = time.perf_counter() - self.origin
+            self._steps.append((name, threading.current_thread().name, now, 0.0))
+
+    def report(self, title: str = "Startup timeline") -> str:
+        with self._lock:
+            steps = sorted(self._steps, key=lambda s: s[2])
+        lines = [f"[Startup] {title}:"]
+        for name, thread, offset, duration in steps:
+            lines.append(f"  {offset * 1000:8.1f} ms  +{duration * 1000:7.1f} ms  {name} ({thread})")
+        return "\n".join(lines)
+
+# Created on first import, which main.py does before anything else
+timeline = StartupTimeline()
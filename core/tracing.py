@@ -0,0 +1,180 @@
+# core/tracing.py
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from config.settings import (
+    METRICS_PROM_FILE, METRICS_JSONL_FILE, METRICS_EXPORT_INTERVAL, TRACE_MAX_OPEN, DEBUG,
+)
+
+# Histogram bucket upper bounds in seconds, shared by every stage
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def percentile(values: Iterable[float], q: float) -> Optional[float]:
+    """Nearest-rank q-quantile of raw samples, or None without any"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+class Histogram:
+    """Per-bucket counts; made cumulative when exported"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation inside the bucket, like histogram_quantile()"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = BUCKETS[i - 1] if i else 0.0
+                if i == len(BUCKETS):
+                    return lower
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+class Tracer:
+    """Per-stage latency histograms and the open traces that feed them.
+
+    A trace starts when a command is heard (or typed) and ends when the
+    answer starts playing (or is shown). Stage spans are recorded against
+    the trace ID carried by each Event.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def begin(self, trace_id: str, at: Optional[float] = None):
+        """Open a trace; at is its time.monotonic() origin (default now)"""
+        with self._lock:
+            if trace_id in self._traces:
+                return
+            self._traces[trace_id] = at or time.monotonic()
+            # Traces that never finish (dropped or coalesced) age out
+            while len(self._traces) > TRACE_MAX_OPEN:
+                self._traces.popitem(last=False)
+
+    def record(self, stage: str, seconds: float, trace_id: Optional[str] = None):
+        with self._lock:
+            if stage not in self._histograms:
+                self._histograms[stage] = Histogram()
+            self._histograms[stage].observe(seconds)
+        if DEBUG and trace_id:
+            print(f"[Tracer] {trace_id} {stage}: {seconds * 1000:.0f} ms")
+
+    @contextmanager
+    def span(self, stage: str, trace_id: Optional[str] = None):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(stage, time.monotonic() - start, trace_id)
+
+    def end(self, trace_id: Optional[str], stage: str) -> Optional[float]:
+        """Close a trace, recording its total time under stage"""
+        with self._lock:
+            origin = self._traces.pop(trace_id, None)
+        if origin is None:
+            return None
+        total = time.monotonic() - origin
+        self.record(stage, total, trace_id)
+        return total
+
+    def discard(self, trace_id: Optional[str]):
+        with self._lock:
+            self._traces.pop(trace_id, None)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                    "buckets": list(h.counts),
+                }
+                for stage, h in self._histograms.items()
+            }
+
+    def prometheus(self) -> str:
+        """Text exposition format, one nex_stage_seconds histogram per stage"""
+        lines = [
+            "# HELP nex_stage_seconds Time spent per pipeline stage",
+            "# TYPE nex_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS + ("+Inf",), h.counts):
+                    cumulative += n
+                    lines.append(f'nex_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'nex_stage_seconds_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'nex_stage_seconds_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def jsonl(self) -> str:
+        """One line per stage, stamped with the wall clock"""
+        now = time.time()
+        return "".join(
+            json.dumps({"time": now, "stage": stage, **values}) + "\n"
+            for stage, values in sorted(self.snapshot().items())
+        )
+
+    def export(self, prom_path: Path = METRICS_PROM_FILE, jsonl_path: Path = METRICS_JSONL_FILE):
+        """Replace the Prometheus file and append a JSONL snapshot"""
+        try:
+            tmp = prom_path.with_suffix(".tmp")
+            tmp.write_text(self.prometheus())
+            tmp.replace(prom_path)
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(self.jsonl())
+        except OSError as e:
+            print(f"[Tracer] Failed to export metrics: {e}")
+
+    def start(self, interval: float = METRICS_EXPORT_INTERVAL):
+        """Export periodically in the background"""
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._export_loop, args=(interval,), name="metrics", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self.export()
+
+    def _export_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.export()
+
+# Global tracer instance
+tracer = Tracer()
@@ -1,18 +1,27 @@
 # main.py
 import sys
-from core.coordinator import Coordinator
-from core.event_bus import event_bus, Event, EventType
-from ui.chat_window import ChatWindow
-from ui.voice_listener import VoiceListener
-from services.speech_service import SpeechService
+import threading
+from core.startup import timeline
+
+# Audio, speech recognition and Groq are imported later, when first used
+with timeline.step("import phase: core"):
+    from core.coordinator import Coordinator
+    from core.event_bus import event_bus, Event, EventType
+    from core.tracing import tracer
+with timeline.step("import phase: ui"):
+    from ui.chat_window import ChatWindow
+    from ui.voice_listener import VoiceListener
+from services.audio_output import audio_output, PRIORITY_ANNOUNCEMENT, PRIORITY_RESPONSE
+from services.llm_gateway import llm_gateway
 from config.settings import DEBUG
 
 class NexAssistant:
     def __init__(self):
-        self.coordinator = Coordinator(event_bus)
-        self.chat_window = ChatWindow()
+        with timeline.step("coordinator"):
+            self.coordinator = Coordinator(event_bus)
+        with timeline.step("chat window"):
+            self.chat_window = ChatWindow()
         self.voice_listener = VoiceListener()
-        self.speech_service = SpeechService()
         
         # Subscribe to all events for debugging
         event_bus.subscribe(EventType.VOICE_INPUT, self._debug_voice)
@@ -32,7 +41,7 @@ class NexAssistant:
         """Handle TTS responses"""
         text = event.data.get("text", "")
         print(f"[DEBUG] Speaking: {text}")
-        self.speech_service.speak(text)
+        audio_output.say(text, event.data.get("priority", PRIORITY_RESPONSE), event.trace_id)
     
     def _check_shutdown(self, event: Event):
         """Check for shutdown command"""
@@ -45,29 +54,57 @@ class NexAssistant:
         print("Starting Nex Assistant...")
         
         # Initialize coordinator
-        self.coordinator.start()
+        with timeline.step("coordinator start"):
+            self.coordinator.start()
+        tracer.start()
+        
+        # The window comes up while audio and voice start behind it
+        threading.Thread(target=self._start_audio, name="startup-audio", daemon=True).start()
         
-        # Start voice listener
-        self.voice_listener.start()
+        self.chat_window.root.after_idle(self._window_ready)
         
-        # Test audio system
+        # Start GUI (blocking)
+        self.chat_window.run()
+    
+    def _window_ready(self):
+        timeline.mark("window ready")
         if DEBUG:
-            print("[Main] Testing audio system...")
-            self.speech_service.speak("Audio test successful")
+            print(timeline.report())
+    
+    def _start_audio(self):
+        """Audio output, voice listening and the Groq client, off the UI thread"""
+        try:
+            with timeline.step("audio output"):
+                audio_output.start()
+            
+            # Announcements queue behind each other instead of blocking startup
+            with timeline.step("voice listener"):
+                self.voice_listener.start()
+        except Exception as e:
+            print(f"[Main] Audio unavailable, chat only: {e}")
+            return
+        if DEBUG:
+            audio_output.say("Audio test successful", PRIORITY_ANNOUNCEMENT)
+        audio_output.say("Nex session started", PRIORITY_ANNOUNCEMENT)
         
-        # Announce ready
-        self.speech_service.speak("Nex session started")
+        with timeline.step("groq client"):
+            llm_gateway.connect()
         
         print("[Main] System ready. Say 'Hey Nex' followed by your command.")
         print("[Main] Examples: 'Hey Nex what's the weather' or 'Hey Nex what time is it'")
+        if DEBUG:
+            print(timeline.report("Startup timeline, audio ready"))
         
-        # Start GUI (blocking)
-        self.chat_window.run()
+        # Fill the TTS cache with fixed phrases in the background
+        audio_output.player.prewarm()
     
     def shutdown(self):
         """shutdown"""
         self.voice_listener.stop()
-        self.speech_service.shutdown()
+        event_bus.shutdown()
+        self.coordinator.shutdown()
+        audio_output.shutdown()
+        tracer.shutdown()
         self.chat_window.close()
         sys.exit(0)
 
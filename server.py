@@ -0,0 +1,38 @@
+# server.py
+"""Headless Nex: the Coordinator behind a local socket, without Tk or audio.
+
+Usage: python server.py [--host 127.0.0.1] [--port 8765] [--workers 8]
+
+Try it with: printf 'what time is it\n' | nc 127.0.0.1 8765
+"""
+import argparse
+import asyncio
+from core.coordinator import Coordinator
+from core.event_bus import event_bus
+from core.tracing import tracer
+from ui.chat_server import ChatServer
+from config.settings import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Nex chat over a local socket")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS,
+                        help="chat sessions handled concurrently")
+    args = parser.parse_args(argv)
+
+    coordinator = Coordinator(event_bus, chat_workers=args.workers)
+    server = ChatServer(event_bus, args.host, args.port)
+    coordinator.start()
+    tracer.start()
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        event_bus.shutdown()
+        coordinator.shutdown()
+        tracer.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# services/action_executor.py
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from typing import Dict, Optional
+from core.tracing import new_trace_id
+from config.settings import (
+    ACTION_CLASSES, ACTION_POLICIES, ACTION_DEFAULT_POLICY,
+    ACTION_PROCESS_POOL, ACTION_PROCESS_WORKERS, DEBUG,
+)
+
+class ActionTimeout(Exception):
+    pass
+
+class ActionCancelled(Exception):
+    pass
+
+def _process_main(conn):
+    """Worker process loop: run (handler, slots, kwargs) requests until closed"""
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        handler, slots, kwargs = request
+        try:
+            conn.send((True, handler(slots, **kwargs)))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_process_main, args=(child,), name="nex-action", daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+class _ProcessPool:
+    """Worker processes for handlers that may burn CPU or hang.
+
+    A thread can only be abandoned, but a process can be killed: a worker
+    that overruns its deadline or is cancelled is killed and replaced on
+    the next call. Handlers must be module-level functions.
+    """
+
+    def __init__(self, size: int):
+        # spawn: forking a process that already runs threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._size = size
+        self._idle = queue.Queue()
+        self._count = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.killed = 0
+
+    def start(self):
+        """Spawn the workers up front; each takes a moment to import"""
+        workers = []
+        while True:
+            with self._lock:
+                if self._closed or self._count >= self._size:
+                    break
+                self._count += 1
+            workers.append(_Worker(self._context))
+        for worker in workers:
+            self._idle.put(worker)
+
+    def run(self, handler, slots: dict, kwargs: dict, task: "_Task"):
+        worker = self._acquire(task.deadline)
+        task.worker = worker
+        if task.cancelled.is_set():
+            worker.kill()
+        try:
+            worker.conn.send((handler, slots, kwargs))
+            # The waiter kills the worker on timeout or cancel, which ends the poll
+            if not worker.conn.poll(max(0.0, task.deadline - time.monotonic()) + 1.0):
+                raise ActionTimeout()
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError, ActionTimeout):
+            self._discard(worker)
+            worker = None
+            if task.cancelled.is_set() and time.monotonic() < task.deadline:
+                raise ActionCancelled()
+            raise ActionTimeout()
+        finally:
+            task.worker = None
+            if worker is not None:
+                self._idle.put(worker)
+        if not ok:
+            raise RuntimeError(value)
+        return value
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self, deadline: float) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise ActionCancelled()
+            spawn = self._count < self._size
+            if spawn:
+                self._count += 1
+        if spawn:
+            return _Worker(self._context)
+        try:
+            return self._idle.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            raise ActionTimeout()
+
+    def _discard(self, worker: _Worker):
+        worker.kill()
+        with self._lock:
+            self._count -= 1
+            self.killed += 1
+
+class _Task:
+    def __init__(self, task_id: str, intent: str, klass: str, deadline: float):
+        self.id = task_id
+        self.intent = intent
+        self.klass = klass
+        self.deadline = deadline
+        self.cancelled = threading.Event()  # Handed to handlers as cancel=
+        self.finished = threading.Event()
+        self.future = None
+        self.pool = None
+        self.worker = None
+        self.isolated = False
+        self.started = False
+        self.returned = False
+        self.stuck = False
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+        worker = self.worker
+        if worker is not None:
+            worker.kill()
+        self.finished.set()
+
+class ActionExecutor:
+    """Runs action handlers with per-intent timeouts and concurrency caps.
+
+    Intents map to a priority class (ACTION_POLICIES). Each class has its
+    own bounded thread pool, so a burst of slow lookups queues behind
+    itself instead of in front of the clock or a timer. Handlers receive
+    deadline= and cancel= (a threading.Event, passed on to http_client) to
+    stop early. A handler still running at its timeout is cancelled and
+    stops at its next request; one in the compute class runs in a worker
+    process and is killed instead. A class whose threads are all stuck in
+    handlers that ignore cancel gets a fresh pool, and the old threads are
+    left to finish on their own.
+    """
+
+    def __init__(self):
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"action-{name}")
+            for name, workers in ACTION_CLASSES.items()
+        }
+        self._processes = _ProcessPool(ACTION_PROCESS_WORKERS) if ACTION_PROCESS_POOL else None
+        self._tasks: Dict[str, _Task] = {}
+        self._lock = threading.Lock()
+        self._counts = {"completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0}
+        self._stuck = 0
+        self._stuck_in = {name: 0 for name in ACTION_CLASSES}  # Stuck threads in each class's current pool
+        self._replaced = 0
+
+    def start(self):
+        if self._processes:
+            threading.Thread(target=self._processes.start, name="action-processes", daemon=True).start()
+
+    def run(self, intent: str, handler, slots: dict, source: str = "unknown",
+            task_id: Optional[str] = None) -> str:
+        """Run handler for intent and return its result.
+
+        Raises ActionTimeout or ActionCancelled, or whatever the handler raised.
+        """
+        klass, timeout = ACTION_POLICIES.get(intent, ACTION_DEFAULT_POLICY)
+        task = _Task(task_id or new_trace_id(), intent, klass, time.monotonic() + timeout)
+        with self._lock:
+            self._tasks[task.id] = task
+        try:
+            # Under the lock, so _abandon cannot swap the pool out mid-submit
+            with self._lock:
+                task.pool = self._pools[klass]
+                if klass == "compute" and self._processes:
+                    task.isolated = True
+                    task.future = task.pool.submit(
+                        self._processes.run, handler, slots, {"source": source, "deadline": task.deadline}, task,
+                    )
+                else:
+                    task.future = task.pool.submit(self._call, task, handler, slots, source)
+            task.future.add_done_callback(lambda _: task.finished.set())
+
+            if not task.finished.wait(timeout):
+                self._abandon(task)
+                raise ActionTimeout()
+            if task.cancelled.is_set():
+                raise ActionCancelled()
+            try:
+                result = task.future.result()
+            except CancelledError:
+                raise ActionCancelled()
+            self._count("completed")
+            return result
+        except ActionTimeout:
+            self._count("timed_out")
+            if DEBUG:
+                print(f"[ActionExecutor] {intent} timed out after {timeout:.1f}s")
+            raise
+        except ActionCancelled:
+            self._count("cancelled")
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        finally:
+            with self._lock:
+                self._tasks.pop(task.id, None)
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel an action in flight; its run() raises ActionCancelled"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    def cancel_all(self):
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counts)
+            stats["in_flight"] = len(self._tasks)
+            stats["stuck"] = self._stuck
+            stats["pools_replaced"] = self._replaced
+        if self._processes:
+            stats["processes_killed"] = self._processes.killed
+        return stats
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._processes:
+            self._processes.shutdown()
+
+    def _call(self, task: _Task, handler, slots: dict, source: str):
+        task.started = True
+        try:
+            if task.cancelled.is_set():
+                raise ActionCancelled()
+            return handler(slots, source=source, deadline=task.deadline, cancel=task.cancelled)
+        finally:
+            with self._lock:
+                task.returned = True
+                if task.stuck:
+                    self._stuck -= 1
+                    if task.pool is self._pools[task.klass]:
+                        self._stuck_in[task.klass] -= 1
+
+    def _abandon(self, task: _Task):
+        """Stop waiting on a task that overran: kill its process, or count its thread as stuck"""
+        task.cancel()
+        if task.isolated:
+            return
+        with self._lock:
+            if not task.started or task.returned:
+                return
+            task.stuck = True
+            self._stuck += 1
+            if task.pool is not self._pools[task.klass]:
+                return
+            self._stuck_in[task.klass] += 1
+            if self._stuck_in[task.klass] < ACTION_CLASSES[task.klass]:
+                return
+            # Every thread is held by a handler that ignored cancel: without a
+            # fresh pool the class would only ever time out from here on
+            old = self._pools[task.klass]
+            self._pools[task.klass] = ThreadPoolExecutor(
+                max_workers=ACTION_CLASSES[task.klass], thread_name_prefix=f"action-{task.klass}",
+            )
+            self._stuck_in[task.klass] = 0
+            self._replaced += 1
+        # Queued tasks stay on the old pool and run if a stuck thread frees up
+        old.shutdown(wait=False)
+        if DEBUG:
+            print(f"[ActionExecutor] All {task.klass} threads stuck, replaced the pool")
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
@@ -1,41 +1,125 @@
 # services/action_service.py
-import os
 import threading
-from datetime import datetime, timedelta
-import json
-from config.settings import REMINDERS_FILE, OPENWEATHER_API_KEY, DEBUG
-from services.weather_service import WeatherService
-from services.web_service import WebService
+from datetime import datetime
+from config.settings import (
+    REMINDERS_FILE, REMINDERS_DB, WEATHER_CITIES_FILE, OPENWEATHER_API_KEY,
+    PREFETCH_SIZE, DEBUG,
+)
 from services.reminder_service import ReminderService
-from services.system_service import SystemService
+from services.prefetch import PrefetchPool
+from services.action_executor import ActionExecutor, ActionTimeout, ActionCancelled
+from services.calculator import calculate
 
 class ActionService:
     def __init__(self):
-        self.weather_service = WeatherService(OPENWEATHER_API_KEY)
-        self.web_service = WebService()
-        self.reminder_service = ReminderService(REMINDERS_FILE)
-        self.system_service = SystemService()
+        # Reminders are built now so due alarms fire; the other services
+        # (and the HTTP stack they import) are built on first use
+        self.reminder_service = ReminderService(REMINDERS_DB, legacy_file=REMINDERS_FILE)
+        self.prefetch = PrefetchPool()
+        self.executor = ActionExecutor()
+        self._services = {}
+        self._services_lock = threading.Lock()
+        self._started = False
         
         # Action registry
         self.actions = {
-            "weather": self.weather_service.get_weather,
+            "weather": self._deferred("weather_service", "get_weather"),
             "time": self._get_time,
             "date": self._get_date,
-            "joke": self.web_service.get_joke,
-            "search": self.web_service.search,
-            "open_site": self.web_service.open_site,
-            "play_music": self.web_service.play_music,
-            "define": self.web_service.define_word,
-            "calculate": self._calculate,
+            "joke": self._deferred("web_service", "get_joke"),
+            "search": self._deferred("web_service", "search"),
+            "open_site": self._deferred("web_service", "open_site"),
+            "play_music": self._deferred("web_service", "play_music"),
+            "define": self._deferred("web_service", "define_word"),
+            "calculate": calculate,
             "reminder_set": self.reminder_service.set_reminder,
             "reminder_list": self.reminder_service.list_reminders,
             "timer": self.reminder_service.set_timer,
-            "system_control": self.system_service.control,
+            "timer_list": self.reminder_service.list_timers,
+            "timer_cancel": self.reminder_service.cancel_timer,
+            "system_control": self._deferred("system_service", "control"),
             "small_talk": self._small_talk,
         }
+        
+        # Content intents answered from a buffer filled in the background
+        self.register_content(
+            "joke", self._deferred("web_service", "fetch_joke"), self._deferred("web_service", "get_joke"),
+        )
+    
+    @property
+    def weather_service(self):
+        return self._service("weather_service")
+    
+    @property
+    def web_service(self):
+        return self._service("web_service")
+    
+    @property
+    def system_service(self):
+        return self._service("system_service")
+    
+    def start(self):
+        """Start background services"""
+        with self._services_lock:
+            self._started = True
+            built = list(self._services.values())
+        self.reminder_service.start()
+        for service in built:
+            if hasattr(service, "start"):
+                service.start()
+        self.prefetch.start()
+        self.executor.start()
+    
+    def shutdown(self):
+        self.executor.shutdown()
+        self.prefetch.shutdown()
+        self.reminder_service.shutdown()
+        with self._services_lock:
+            built = list(self._services.values())
+        for service in built:
+            if hasattr(service, "shutdown"):
+                service.shutdown()
+    
+    def _service(self, name: str):
+        """Build a service the first time it is needed"""
+        with self._services_lock:
+            service = self._services.get(name)
+            if service is None:
+                if name == "weather_service":
+                    from services.weather_service import WeatherService
+                    service = WeatherService(OPENWEATHER_API_KEY, WEATHER_CITIES_FILE)
+                elif name == "web_service":
+                    from services.web_service import WebService
+                    service = WebService()
+                else:
+                    from services.system_service import SystemService
+                    service = SystemService()
+                if DEBUG:
+                    print(f"[ActionService] Built {name}")
+                self._services[name] = service
+                if self._started and hasattr(service, "start"):
+                    service.start()
+        return service
+    
+    def _deferred(self, service: str, method: str):
+        """Handler that calls service.method, building the service on first use"""
+        return lambda *args, **kwargs: getattr(self._service(service), method)(*args, **kwargs)
     
-    def execute(self, intent_data: dict, source: str = "unknown") -> str:
-        """Execute action based on intent"""
+    def register_content(self, intent: str, fetch, fallback, size: int = PREFETCH_SIZE):
+        """Serve intent from prefetched fetch(deadline) results, calling fallback when empty"""
+        self.prefetch.register(intent, fetch, size)
+        
+        def serve(slots: dict, **kwargs) -> str:
+            item = self.prefetch.take(intent)
+            if item is None:
+                item = fallback(slots, **kwargs)
+                self.prefetch.remember(intent, item)
+            return item
+        
+        self.actions[intent] = serve
+    
+    def execute(self, intent_data: dict, source: str = "unknown", trace_id: str = None) -> str:
+        """Execute action based on intent; trace_id lets the caller cancel it"""
         intent = intent_data.get("intent", "unknown")
         slots = intent_data.get("slots", {})
         
@@ -47,13 +131,21 @@ class ActionService:
             return "I don't know how to answer that, but I'm here."
         
         try:
-            result = action(slots, source=source)
+            result = self.executor.run(intent, action, slots, source=source, task_id=trace_id)
             return result or "Action completed."
+        except ActionTimeout:
+            return "Sorry, that's taking too long."
+        except ActionCancelled:
+            return "Cancelled."
         except Exception as e:
             if DEBUG:
                 print(f"[ActionService] Error executing {intent}: {e}")
             return f"Sorry, I had trouble with that: {str(e)}"
     
+    def cancel(self, trace_id: str) -> bool:
+        """Cancel the action started for trace_id, if it is still running"""
+        return self.executor.cancel(trace_id)
+    
     def _get_time(self, slots: dict, **kwargs) -> str:
         now = datetime.now().strftime("%I:%M %p")
         return f"The time is {now}"
@@ -62,20 +154,6 @@ class ActionService:
         today = datetime.now().strftime("%A, %B %d, %Y")
         return f"Today is {today}"
     
-    def _calculate(self, slots: dict, **kwargs) -> str:
-        expr = slots.get("expr", "")
-        if not expr:
-            return "What should I calculate?"
-        
-        # Simple evaluation (use with caution - production should use safer methods)
-        try:
-            # Replace words with operators
-            expr = expr.replace("times", "*").replace("x", "*").replace("plus", "+")
-            result = eval(expr, {"__builtins__": {}}, {})
-            return f"The answer is {result}"
-        except:
-            return "I couldn't calculate that."
-    
     def _small_talk(self, slots: dict, **kwargs) -> str:
         text = slots.get("text", "").lower()
         
@@ -0,0 +1,149 @@
+# services/audio_capture.py
+import audioop
+import threading
+import time
+from collections import deque
+from typing import Optional
+import speech_recognition as sr
+from config.settings import (
+    MIC_RING_SECONDS, MIC_PRE_ROLL_SECONDS, MIC_PAUSE_SECONDS,
+    MIC_ENERGY_RATIO, MIC_MIN_ENERGY, DEBUG,
+)
+
+class AudioCapture:
+    """One long-lived microphone stream feeding a ring buffer.
+
+    A capture thread reads every chunk into the ring and tracks the noise
+    floor as it goes. next_phrase() segments speech out of the ring, so
+    nothing is lost between listen calls.
+    """
+
+    def __init__(self, microphone: sr.Microphone = None):
+        self.microphone = microphone or sr.Microphone()
+        self.noise_floor = MIC_MIN_ENERGY
+        self._source = None
+        self._frames = deque()
+        self._written = 0
+        self._read = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    @property
+    def threshold(self) -> float:
+        return max(MIC_MIN_ENERGY, self.noise_floor * MIC_ENERGY_RATIO)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        try:
+            self._source = self.microphone.__enter__()
+        except Exception:
+            # No microphone or device busy: let a later start() try again
+            with self._cond:
+                self._running = False
+            raise
+        seconds_per_chunk = self._source.CHUNK / self._source.SAMPLE_RATE
+        self._frames = deque(maxlen=int(MIC_RING_SECONDS / seconds_per_chunk))
+        self._thread = threading.Thread(target=self._capture_loop, name="mic-capture", daemon=True)
+        self._thread.start()
+        if DEBUG:
+            print("[AudioCapture] Microphone stream opened")
+
+    def stop(self):
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+        try:
+            self.microphone.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def next_phrase(self, timeout: Optional[float] = None,
+                    phrase_time_limit: Optional[float] = None) -> Optional[sr.AudioData]:
+        """Next span of speech from the ring, or None if none starts in time"""
+        if not self._running:
+            self.start()
+
+        source = self._source
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        pre_roll = deque(maxlen=max(1, int(MIC_PRE_ROLL_SECONDS / seconds_per_chunk)))
+        pause_chunks = max(1, int(MIC_PAUSE_SECONDS / seconds_per_chunk))
+        limit_chunks = int(phrase_time_limit / seconds_per_chunk) if phrase_time_limit else None
+        deadline = time.monotonic() + timeout if timeout else None
+
+        phrase = None
+        quiet = 0
+        while True:
+            frame = self._next_frame(deadline if phrase is None else None)
+            if frame is None:
+                if phrase:
+                    break
+                return None
+
+            loud = audioop.rms(frame, source.SAMPLE_WIDTH) > self.threshold
+            if phrase is None:
+                if loud:
+                    phrase = list(pre_roll)
+                    phrase.append(frame)
+                else:
+                    pre_roll.append(frame)
+                continue
+
+            phrase.append(frame)
+            quiet = 0 if loud else quiet + 1
+            if quiet >= pause_chunks or (limit_chunks and len(phrase) >= limit_chunks):
+                break
+
+        return sr.AudioData(b"".join(phrase), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def _next_frame(self, deadline: Optional[float]) -> Optional[bytes]:
+        with self._cond:
+            while self._running and self._read >= self._written:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if not self._running:
+                return None
+
+            oldest = self._written - len(self._frames)
+            if self._read < oldest:
+                if DEBUG:
+                    print(f"[AudioCapture] Reader fell behind, skipped {oldest - self._read} chunks")
+                self._read = oldest
+            frame = self._frames[self._read - oldest]
+            self._read += 1
+            return frame
+
+    def _capture_loop(self):
+        source = self._source
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        # Same damping sr.Recognizer uses for its dynamic energy threshold
+        damping = 0.15 ** seconds_per_chunk
+        while self._running:
+            try:
+                frame = source.stream.read(source.CHUNK)
+            except Exception as e:
+                print(f"[AudioCapture] Read error: {e}")
+                time.sleep(0.1)
+                continue
+
+            # Loud chunks still pull the floor up slowly so a lasting rise
+            # in ambient noise is not mistaken for endless speech
+            energy = audioop.rms(frame, source.SAMPLE_WIDTH)
+            rate = 1 - damping
+            if energy > self.threshold:
+                rate *= 0.05
+            self.noise_floor += (energy - self.noise_floor) * rate
+
+            with self._cond:
+                self._frames.append(frame)
+                self._written += 1
+                self._cond.notify_all()
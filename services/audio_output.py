@@ -0,0 +1,144 @@
+# services/audio_output.py
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from core.startup import timeline
+from core.tracing import tracer
+from config.settings import DEBUG
+
+# Lower numbers play first and interrupt anything with a higher number
+PRIORITY_ALARM = 0
+PRIORITY_RESPONSE = 1
+PRIORITY_ANNOUNCEMENT = 2
+
+class _Message:
+    def __init__(self, text: str, priority: int, trace_id: str = None):
+        self.text = text
+        self.priority = priority
+        self.trace_id = trace_id
+        self.enqueued = time.monotonic()
+        self.future = Future()
+        # Set to cut this message off, even before it starts; never cleared
+        self.stop = threading.Event()
+
+class AudioOutput:
+    """Single speaker for the whole process: one queue, one playback thread"""
+
+    def __init__(self):
+        # Built by start(): importing the audio stack is slow, and messages
+        # said before then simply wait in the queue
+        self.player = None
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._thread = None
+        self._running = False
+        self.played = 0
+        self.coalesced = 0
+        self.preempted = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self):
+        """Initialize the mixer and start the playback thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        with timeline.step("import speech_service"):
+            from services.speech_service import SpeechService
+        self.player = SpeechService()
+        self.player.initialize()
+        self._thread = threading.Thread(target=self._run, name="audio-output", daemon=True)
+        self._thread.start()
+
+    def say(self, text: str, priority: int = PRIORITY_RESPONSE, trace_id: str = None) -> Future:
+        """Queue text for playback; the future resolves to True once it was heard"""
+        if not text:
+            future = Future()
+            future.set_result(False)
+            return future
+
+        with self._cond:
+            # Identical text already waiting or playing is said only once
+            for entry in self._heap:
+                message = entry[2]
+                if message.text == text:
+                    if priority < message.priority:
+                        message.priority = entry[0] = priority
+                        heapq.heapify(self._heap)
+                    self.coalesced += 1
+                    return message.future
+            current = self._current
+            if current and current.text == text and priority >= current.priority:
+                self.coalesced += 1
+                return current.future
+
+            message = _Message(text, priority, trace_id)
+            heapq.heappush(self._heap, [priority, next(self._seq), message])
+
+            # Barge-in: a more urgent message cuts off the current one
+            if current and priority < current.priority:
+                self.preempted += 1
+                if DEBUG:
+                    print(f"[AudioOutput] Interrupting '{current.text}' for '{text}'")
+                current.stop.set()
+
+            self._cond.notify()
+        return message.future
+
+    def depth(self) -> int:
+        """Messages waiting to be played"""
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "depth": len(self._heap),
+                "played": self.played,
+                "coalesced": self.coalesced,
+                "preempted": self.preempted,
+                "avg_wait": self._wait_total / self.played if self.played else 0.0,
+                "max_wait": self._wait_max,
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            pending = [entry[2] for entry in self._heap]
+            self._heap.clear()
+            self._cond.notify_all()
+        for message in pending:
+            message.future.set_result(False)
+        if self.player:
+            self.player.shutdown()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                message = heapq.heappop(self._heap)[2]
+                self._current = message
+                waited = time.monotonic() - message.enqueued
+                self.played += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+            heard = False
+            try:
+                tracer.record("speak_queue", waited, message.trace_id)
+                heard = self.player.speak(message.text, trace_id=message.trace_id, stop=message.stop)
+            finally:
+                with self._cond:
+                    self._current = None
+                message.future.set_result(bool(heard))
+
+# Global audio output instance
+audio_output = AudioOutput()
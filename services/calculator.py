@@ -0,0 +1,283 @@
+# services/calculator.py
+# Module-level so the action executor can run it in a worker process
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+from config.settings import CALC_MAX_OPERATIONS, CALC_MAX_DIGITS, CALC_CACHE_SIZE
+
+class CalcError(ValueError):
+    """Raised with a message that can be read back to the user"""
+
+_MAX_INT = 10 ** CALC_MAX_DIGITS
+_TOO_LARGE = "That number is too large to work out."
+
+# Spoken arithmetic, rewritten before parsing; x only counts between operands
+_SPOKEN = [
+    (re.compile(r"(\d),(?=\d{3}\b)"), r"\1"),
+    (re.compile(r"([\d.]+) ?(?:percent|%) of\b"), r"(\1/100)*"),
+    (re.compile(r"\bsquare root of ([\d.]+)"), r"sqrt(\1)"),
+    (re.compile(r"\bto the power of\b|\^"), "**"),
+    (re.compile(r"\bsquared\b"), "**2"),
+    (re.compile(r"\bcubed\b"), "**3"),
+    (re.compile(r"\bdivided by\b|\bover\b"), "/"),
+    (re.compile(r"\bmultiplied by\b|\btimes\b|(?<=[\d)]) ?x ?(?=[\d(])"), "*"),
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b"), "-"),
+    (re.compile(r"\bmod(?:ulo)?\b"), "%"),
+]
+
+def _pow(base, exponent):
+    # Refuse before computing: 9**9**9 would otherwise run for hours
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * math.log10(abs(base)) >= CALC_MAX_DIGITS:
+            raise CalcError(_TOO_LARGE)
+    return base ** exponent
+
+def _factorial(n):
+    if n != int(n) or n < 0:
+        raise CalcError("Factorials need a whole number.")
+    if n > 200:
+        raise CalcError(_TOO_LARGE)
+    return math.factorial(int(n))
+
+def _round(value, ndigits=None):
+    # int.__round__ computes 10**-ndigits, so round(5, -10**9) never returns
+    if ndigits is None:
+        return round(value)
+    if ndigits != int(ndigits) or abs(ndigits) > CALC_MAX_DIGITS:
+        raise CalcError("I can only round to a sensible number of places.")
+    return round(value, int(ndigits))
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _pow,
+}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FUNCTIONS = {
+    "sqrt": math.sqrt, "abs": abs, "round": _round, "floor": math.floor, "ceil": math.ceil,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    "log": math.log, "ln": math.log, "log10": math.log10, "log2": math.log2, "exp": math.exp,
+    "factorial": _factorial, "radians": math.radians, "degrees": math.degrees,
+}
+_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+def _check(value):
+    """Bound every intermediate result"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise CalcError("That has no real answer.")
+    if isinstance(value, int):
+        if abs(value) >= _MAX_INT:
+            raise CalcError(_TOO_LARGE)
+    elif math.isinf(value) or math.isnan(value):
+        raise CalcError(_TOO_LARGE)
+    return value
+
+def _compile(node, budget: list):
+    """Turn a whitelisted AST node into a closure"""
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise CalcError("That expression is too long.")
+
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = _check(node.value)
+        return lambda: value
+    if isinstance(node, ast.Name) and node.id in _CONSTANTS:
+        value = _CONSTANTS[node.id]
+        return lambda: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left, right = _compile(node.left, budget), _compile(node.right, budget)
+        return lambda: _check(op(left(), right()))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op = _UNARY[type(node.op)]
+        operand = _compile(node.operand, budget)
+        return lambda: op(operand())
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _FUNCTIONS and not node.keywords):
+        func = _FUNCTIONS[node.func.id]
+        args = [_compile(arg, budget) for arg in node.args]
+        # Arguments are bounded too before any function sees them
+        return lambda: _check(func(*(_check(arg()) for arg in args)))
+    raise CalcError("I can only do arithmetic.")
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def compile_expression(expr: str):
+    """Parse expr into a function of no arguments; raises CalcError"""
+    text = expr.strip().lower().rstrip("=?").strip()
+    for pattern, replacement in _SPOKEN:
+        text = pattern.sub(replacement, text)
+    try:
+        tree = ast.parse(text, mode="eval")
+    except (SyntaxError, ValueError):
+        raise CalcError("I couldn't understand that expression.")
+    return _compile(tree.body, [CALC_MAX_OPERATIONS])
+
+def evaluate(expr: str):
+    func = compile_expression(expr)
+    try:
+        return func()
+    except CalcError:
+        raise
+    except ZeroDivisionError:
+        raise CalcError("You can't divide by zero.")
+    except OverflowError:
+        raise CalcError(_TOO_LARGE)
+    except (ValueError, TypeError):
+        raise CalcError("I couldn't calculate that.")
+
+def format_number(value) -> str:
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    return str(value)
+
+# dimension -> (singular, plural, scale to the base unit, offset, aliases)
+_UNITS = {
+    "length": [
+        ("millimeter", "millimeters", 0.001, 0.0, ("mm", "millimetre", "millimetres")),
+        ("centimeter", "centimeters", 0.01, 0.0, ("cm", "centimetre", "centimetres")),
+        ("meter", "meters", 1.0, 0.0, ("m", "metre", "metres")),
+        ("kilometer", "kilometers", 1000.0, 0.0, ("km", "kms", "kilometre", "kilometres")),
+        ("inch", "inches", 0.0254, 0.0, ()),
+        ("foot", "feet", 0.3048, 0.0, ("ft",)),
+        ("yard", "yards", 0.9144, 0.0, ("yd", "yds")),
+        ("mile", "miles", 1609.344, 0.0, ("mi",)),
+    ],
+    "mass": [
+        ("milligram", "milligrams", 1e-6, 0.0, ("mg",)),
+        ("gram", "grams", 0.001, 0.0, ("g", "gm")),
+        ("kilogram", "kilograms", 1.0, 0.0, ("kg", "kgs", "kilo", "kilos")),
+        ("tonne", "tonnes", 1000.0, 0.0, ("t", "metric ton", "metric tons")),
+        ("ounce", "ounces", 0.028349523125, 0.0, ("oz",)),
+        ("pound", "pounds", 0.45359237, 0.0, ("lb", "lbs")),
+        ("stone", "stone", 6.35029318, 0.0, ("st",)),
+    ],
+    "volume": [
+        ("milliliter", "milliliters", 0.001, 0.0, ("ml", "millilitre", "millilitres")),
+        ("liter", "liters", 1.0, 0.0, ("l", "litre", "litres")),
+        ("teaspoon", "teaspoons", 0.00492892159375, 0.0, ("tsp",)),
+        ("tablespoon", "tablespoons", 0.01478676478125, 0.0, ("tbsp",)),
+        ("fluid ounce", "fluid ounces", 0.0295735295625, 0.0, ("fl oz",)),
+        ("cup", "cups", 0.2365882365, 0.0, ()),
+        ("pint", "pints", 0.473176473, 0.0, ("pt",)),
+        ("quart", "quarts", 0.946352946, 0.0, ("qt",)),
+        ("gallon", "gallons", 3.785411784, 0.0, ("gal",)),
+    ],
+    "time": [
+        ("millisecond", "milliseconds", 0.001, 0.0, ("ms",)),
+        ("second", "seconds", 1.0, 0.0, ("s", "sec", "secs")),
+        ("minute", "minutes", 60.0, 0.0, ("min", "mins")),
+        ("hour", "hours", 3600.0, 0.0, ("h", "hr", "hrs")),
+        ("day", "days", 86400.0, 0.0, ("d",)),
+        ("week", "weeks", 604800.0, 0.0, ("wk", "wks")),
+    ],
+    "speed": [
+        ("meter per second", "meters per second", 1.0, 0.0, ("m/s",)),
+        ("kilometer per hour", "kilometers per hour", 1 / 3.6, 0.0, ("km/h", "kph", "kmh")),
+        ("mile per hour", "miles per hour", 0.44704, 0.0, ("mph",)),
+        ("knot", "knots", 1852 / 3600, 0.0, ("kn", "kt")),
+    ],
+    "temperature": [
+        ("degree Celsius", "degrees Celsius", 1.0, 0.0, ("c", "celsius", "centigrade")),
+        ("degree Fahrenheit", "degrees Fahrenheit", 5 / 9, -160 / 9, ("f", "fahrenheit")),
+        ("kelvin", "kelvin", 1.0, -273.15, ("k",)),
+    ],
+    "data": [
+        ("byte", "bytes", 1.0, 0.0, ("b",)),
+        ("kilobyte", "kilobytes", 1e3, 0.0, ("kb",)),
+        ("megabyte", "megabytes", 1e6, 0.0, ("mb",)),
+        ("gigabyte", "gigabytes", 1e9, 0.0, ("gb",)),
+        ("terabyte", "terabytes", 1e12, 0.0, ("tb",)),
+    ],
+}
+
+# Conversions asked for with no target unit
+DEFAULT_TARGETS = {
+    "kilometer": "mile", "mile": "kilometer", "meter": "foot", "foot": "meter",
+    "centimeter": "inch", "inch": "centimeter", "kilogram": "pound", "pound": "kilogram",
+    "gram": "ounce", "ounce": "gram", "liter": "gallon", "gallon": "liter",
+    "degree Celsius": "degree Fahrenheit", "degree Fahrenheit": "degree Celsius",
+    "kilometer per hour": "mile per hour", "mile per hour": "kilometer per hour",
+}
+
+def _build_tables():
+    plurals, aliases, conversions = {}, {}, {}
+    for units in _UNITS.values():
+        for singular, plural, _, _, names in units:
+            plurals[singular] = plural
+            for alias in (singular, plural) + names:
+                aliases[alias.lower()] = singular
+        # value in b = value in a * scale + offset, for every pair
+        for a, _, scale_a, offset_a, _ in units:
+            for b, _, scale_b, offset_b, _ in units:
+                conversions[(a, b)] = (scale_a / scale_b, (offset_a - offset_b) / scale_b)
+    return plurals, aliases, conversions
+
+PLURALS, UNIT_ALIASES, CONVERSIONS = _build_tables()
+
+_TARGET = re.compile(r"^(?P<source>.+?)\s+(?:to|in|into|as)\s+(?P<target>[a-z°][a-z°/ ]*)$")
+_QUANTITY = re.compile(r"^(?P<amount>[\d.,+\-*/()^ ]*[\d)])\s*(?P<unit>[a-z°][a-z°/ ]*)$")
+
+def _unit(name: str) -> Optional[str]:
+    key = re.sub(r"^(?:a|an|the)\s+|°|\bdegrees?\s+", "", name.strip().lower()).strip()
+    return UNIT_ALIASES.get(key)
+
+def _parse_conversion(text: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """(amount, unit, target) for text like '5 km to miles', else None"""
+    target = None
+    m = _TARGET.match(text)
+    if m:
+        text, target = m.group("source"), m.group("target")
+    q = _QUANTITY.match(text)
+    if not q or not _unit(q.group("unit")):
+        return None
+    return q.group("amount"), q.group("unit"), target
+
+def convert(amount: str, unit: str, target: Optional[str] = None) -> str:
+    value = evaluate(amount)
+    source = _unit(unit)
+    if source is None:
+        raise CalcError(f"I don't know the unit {unit}.")
+    dest = _unit(target) if target else DEFAULT_TARGETS.get(source)
+    if dest is None:
+        raise CalcError(f"I don't know the unit {target}." if target else f"What should I convert {unit} to?")
+    if (source, dest) not in CONVERSIONS:
+        raise CalcError(f"I can't convert {PLURALS[source]} to {PLURALS[dest]}.")
+    scale, offset = CONVERSIONS[(source, dest)]
+    result = float(f"{value * scale + offset:.4g}")
+    source_name = source if value == 1 else PLURALS[source]
+    dest_name = dest if result == 1 else PLURALS[dest]
+    return f"{format_number(value)} {source_name} is {format_number(result)} {dest_name}."
+
+def calculate(slots: dict, **kwargs) -> str:
+    expr = (slots.get("expr") or "").strip().lower()
+    amount = str(slots.get("amount") or "").strip()
+    unit = (slots.get("unit") or "").strip().lower()
+
+    try:
+        if amount and unit:
+            # The target may come with the unit ("km to miles") or in expr
+            target = None
+            m = _TARGET.match(unit)
+            if m:
+                unit, target = m.group("source"), m.group("target")
+            elif _TARGET.match(expr):
+                target = _TARGET.match(expr).group("target")
+            return convert(amount, unit, target)
+        if not expr:
+            return "What should I calculate?"
+        conversion = _parse_conversion(expr)
+        if conversion:
+            return convert(*conversion)
+        return f"The answer is {format_number(evaluate(expr))}"
+    except CalcError as e:
+        return str(e)
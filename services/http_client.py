@@ -0,0 +1,128 @@
+# services/http_client.py
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from core.tracing import percentile
+from config.settings import (
+    HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_BACKOFF, HTTP_DEFAULT_BUDGET,
+    HTTP_ATTEMPT_TIMEOUT, HTTP_ASYNC_WORKERS, DEBUG,
+)
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class DeadlineExceeded(requests.Timeout):
+    """The caller's time budget ran out before a response arrived"""
+
+class Cancelled(requests.RequestException):
+    """The caller gave up on the request (see the cancel argument of get)"""
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=256)
+
+    def snapshot(self) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "p50_ms": (percentile(latencies, 0.5) or 0.0) * 1000,
+            "p95_ms": (percentile(latencies, 0.95) or 0.0) * 1000,
+        }
+
+class HttpClient:
+    """Shared keep-alive session with retries bounded by the caller's deadline"""
+
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats: Dict[str, _HostStats] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=HTTP_ASYNC_WORKERS, thread_name_prefix="http")
+
+    def get(self, url: str, params: dict = None, deadline: Optional[float] = None,
+            retries: int = HTTP_RETRIES, cancel: Optional[threading.Event] = None,
+            **kwargs) -> requests.Response:
+        """GET with jittered retries; deadline is a time.monotonic() value.
+
+        Once cancel is set no further attempt is made and any backoff wait
+        ends; an attempt already sent runs to HTTP_ATTEMPT_TIMEOUT at most.
+        """
+        if deadline is None:
+            deadline = time.monotonic() + HTTP_DEFAULT_BUDGET
+        host = urlsplit(url).netloc
+        stats = self._host(host)
+
+        attempt = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled(f"Request to {host} was cancelled")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"No response from {host} within the deadline")
+
+            start = time.monotonic()
+            error = None
+            try:
+                response = self.session.get(
+                    url, params=params, timeout=min(remaining, HTTP_ATTEMPT_TIMEOUT), **kwargs
+                )
+                if response.status_code not in _RETRY_STATUS:
+                    self._record(stats, time.monotonic() - start)
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from {host}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            self._record(stats, time.monotonic() - start, failed=True)
+
+            # Full jitter keeps retries from several callers apart
+            backoff = random.uniform(0, HTTP_BACKOFF * (2 ** attempt))
+            if attempt >= retries or time.monotonic() + backoff >= deadline:
+                if isinstance(error, requests.HTTPError):
+                    return error.response
+                raise error
+            attempt += 1
+            with self._lock:
+                stats.retries += 1
+            if DEBUG:
+                print(f"[HttpClient] Retrying {host} in {backoff:.2f}s after: {error}")
+            if cancel is None:
+                time.sleep(backoff)
+            elif cancel.wait(backoff):
+                raise Cancelled(f"Request to {host} was cancelled")
+
+    def get_async(self, url: str, params: dict = None, deadline: Optional[float] = None,
+                  **kwargs) -> Future:
+        """Same as get(), run on the client's worker pool"""
+        return self._pool.submit(self.get, url, params, deadline, **kwargs)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-host request counts and latency percentiles"""
+        with self._lock:
+            return {host: s.snapshot() for host, s in self._stats.items()}
+
+    def _host(self, host: str) -> _HostStats:
+        with self._lock:
+            if host not in self._stats:
+                self._stats[host] = _HostStats()
+            return self._stats[host]
+
+    def _record(self, stats: _HostStats, latency: float, failed: bool = False):
+        with self._lock:
+            stats.requests += 1
+            stats.errors += failed
+            stats.latencies.append(latency)
+
+# Shared by every network-backed service
+http_client = HttpClient()
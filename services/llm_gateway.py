@@ -0,0 +1,376 @@
+# services/llm_gateway.py
+import email.utils
+import json
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Iterator, List, Optional
+from config.settings import (
+    GROQ_API_KEY, GROQ_MODEL, GROQ_TIMEOUT, GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE,
+    LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN, DEBUG,
+)
+from core.intent_stream import IntentStreamParser
+from core.startup import timeline
+from core.tracing import percentile
+
+INTENT_PROMPT = """You are Nex's intent extraction agent. Return ONLY a JSON object with this exact format:
+{
+  "intent": "weather|time|date|reminder_set|reminder_list|timer|timer_list|timer_cancel|joke|search|open_site|play_music|define|calculate|system_control|small_talk|unknown",
+  "slots": {"city": "...", "query": "...", "song": "...", "word": "...", "expr": "...", "amount": "...", "unit": "...", "datetime": "...", "target": "...", "text": "...", "label": "..."}
+}
+Extract any slots from the user's message. Do not include any commentary or markdown."""
+
+class LLMUnavailable(Exception):
+    """The gateway refused the call: circuit open or rate limit not met in time"""
+
+def _parse_duration(value: str) -> float:
+    """Groq reset headers look like '7.66s', '2m59.56s' or '120ms'"""
+    total = 0.0
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value or ""):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    """Retry-After is either seconds or an HTTP date; 0 (no block) if unreadable"""
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return 0.0
+
+class _TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 means it is)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def sync(self, remaining: Optional[str], reset: Optional[str], now: float):
+        """Trust the server's view of the remaining budget"""
+        if remaining is None:
+            return
+        self.tokens = min(self.capacity, float(remaining))
+        self.updated = now
+        if self.tokens <= 0 and reset:
+            self.blocked_until = now + _parse_duration(reset)
+
+class LLMGateway:
+    """The one Groq client in the process.
+
+    Identical concurrent requests share a single call, a client-side token
+    bucket keeps request and token rates under Groq's limits (corrected
+    from its rate-limit headers), and a circuit breaker stops calling
+    after repeated failures.
+    """
+
+    def __init__(self):
+        # Created on first use; importing groq is slow
+        self.client = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._requests = _TokenBucket(GROQ_REQUESTS_PER_MINUTE)
+        self._tokens = _TokenBucket(GROQ_TOKENS_PER_MINUTE)
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._latencies = deque(maxlen=500)
+        self._first_token = deque(maxlen=500)
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def connect(self):
+        """The Groq client, created on first call"""
+        with self._lock:
+            if self.client is None:
+                with timeline.step("import groq"):
+                    from groq import Groq
+                self.client = Groq(api_key=GROQ_API_KEY, timeout=GROQ_TIMEOUT, max_retries=0)
+            return self.client
+
+    def complete(self, messages: List[dict], model: str = GROQ_MODEL, max_tokens: int = 150,
+                 temperature: float = 0.1, wait: float = GROQ_TIMEOUT, coalesce: bool = True) -> str:
+        """Completion text; raises LLMUnavailable or the underlying Groq error"""
+        key = json.dumps([model, messages, max_tokens, temperature], sort_keys=True)
+        call = lambda: self._call(messages, model, max_tokens, temperature, wait)
+        return self._shared(key, call, coalesce, wait)
+
+    def stream(self, messages: List[dict], model: str = GROQ_MODEL, max_tokens: int = 150,
+               temperature: float = 0.1, wait: float = GROQ_TIMEOUT) -> Iterator[str]:
+        """Completion text as it arrives; closing the generator ends the request"""
+        self._admit(sum(len(m["content"]) for m in messages) / 4 + max_tokens, wait)
+
+        start = time.monotonic()
+        try:
+            raw = self.connect().chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+            )
+            self._sync_limits(raw.headers)
+            chunks = raw.parse()
+        except Exception as e:
+            self._failed(e)
+            raise
+
+        failed = True
+        try:
+            for chunk in chunks:
+                # Groq reports usage on the last chunk
+                usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage:
+                    self._count_usage(usage)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                if failed:
+                    failed = False
+                    with self._lock:
+                        self._first_token.append(time.monotonic() - start)
+                yield chunk.choices[0].delta.content
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+            if failed:
+                self._settle(failed=True)
+            else:
+                with self._lock:
+                    self.calls += 1
+                    self._latencies.append(time.monotonic() - start)
+                self._settle(failed=False)
+
+    def stream_intent(self, text: str, early=(), coalesce: bool = True, wait: float = GROQ_TIMEOUT) -> Optional[dict]:
+        """Streamed extract_intent that returns {"intent": x, "slots": {}} as soon
+        as the intent is one of early, without waiting for the slots"""
+        key = json.dumps(["stream", text, sorted(early)])
+        try:
+            return self._shared(key, lambda: self._stream_intent(text, early, wait), coalesce, wait)
+        except Exception as e:
+            if DEBUG:
+                print(f"[LLMGateway] Groq error: {e}")
+            return None
+
+    def extract_intent(self, text: str, coalesce: bool = True, wait: float = GROQ_TIMEOUT) -> Optional[dict]:
+        """Intent JSON for text, or None if Groq is unavailable or answers badly"""
+        content = ""
+        try:
+            content = self.complete(
+                [{"role": "system", "content": INTENT_PROMPT}, {"role": "user", "content": text}],
+                wait=wait,
+                coalesce=coalesce,
+            )
+            # Clean up response (remove markdown if present)
+            content = content.replace("```json", "").replace("```", "").strip()
+            parsed = json.loads(content)
+            if "intent" in parsed and "slots" in parsed:
+                return parsed
+        except json.JSONDecodeError as e:
+            if DEBUG:
+                print(f"[LLMGateway] JSON parse error: {e}")
+                print(f"[LLMGateway] Raw content: {content}")
+        except Exception as e:
+            if DEBUG:
+                print(f"[LLMGateway] Groq error: {e}")
+        return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "p50": percentile(self._latencies, 0.5),
+                "p95": percentile(self._latencies, 0.95),
+                "first_token_p50": percentile(self._first_token, 0.5),
+                "circuit": "open" if time.monotonic() < self._open_until else "closed",
+            }
+
+    def _shared(self, key: str, call: Callable, coalesce: bool, wait: float):
+        """Run call, or wait on an identical one already in flight"""
+        with self._lock:
+            shared = self._in_flight.get(key) if coalesce else None
+            if shared:
+                self.coalesced += 1
+            else:
+                future = Future()
+                if coalesce:
+                    self._in_flight[key] = future
+        if shared:
+            return shared.result(timeout=wait)
+
+        try:
+            result = call()
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            if coalesce:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+
+    def _stream_intent(self, text: str, early, wait: float) -> Optional[dict]:
+        parser = IntentStreamParser()
+        tokens = self.stream(
+            [{"role": "system", "content": INTENT_PROMPT}, {"role": "user", "content": text}],
+            wait=wait,
+        )
+        try:
+            for delta in tokens:
+                intent = parser.feed(delta)
+                if intent and intent in early:
+                    if DEBUG:
+                        print(f"[LLMGateway] Early intent: {intent}")
+                    return {"intent": intent, "slots": {}}
+                if parser.done:
+                    break
+        finally:
+            tokens.close()
+
+        try:
+            parsed = parser.result()
+        except ValueError as e:
+            parsed = None
+            if DEBUG:
+                print(f"[LLMGateway] JSON parse error: {e}")
+        if parsed and "intent" in parsed and "slots" in parsed:
+            return parsed
+        return None
+
+    def _call(self, messages, model, max_tokens, temperature, wait) -> str:
+        self._admit(sum(len(m["content"]) for m in messages) / 4 + max_tokens, wait)
+
+        start = time.monotonic()
+        succeeded = False
+        error = None
+        try:
+            raw = self.connect().chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+            self._sync_limits(raw.headers)
+            completion = raw.parse()
+            content = completion.choices[0].message.content.strip()
+            if getattr(completion, "usage", None):
+                self._count_usage(completion.usage)
+            succeeded = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Always settle, or a failed half-open probe would keep the circuit shut
+            if succeeded:
+                latency = time.monotonic() - start
+                with self._lock:
+                    self.calls += 1
+                    self._latencies.append(latency)
+                self._settle(failed=False)
+            else:
+                self._failed(error)
+
+        if DEBUG:
+            print(f"[LLMGateway] {model} answered in {latency * 1000:.0f} ms")
+        return content
+
+    def _admit(self, tokens: float, wait: float):
+        """Block until the breaker and both buckets allow the call, or give up"""
+        give_up = time.monotonic() + wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._open_until or self._probing:
+                    self.rejected += 1
+                    raise LLMUnavailable("Groq circuit is open")
+                delay = max(self._requests.wait_for(1, now), self._tokens.wait_for(tokens, now))
+                if delay == 0:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    # Cooldown over: this call alone probes whether Groq is back
+                    self._probing = bool(self._open_until)
+                    return
+                if now + delay > give_up:
+                    self.rejected += 1
+                    raise LLMUnavailable(f"Groq rate limit needs {delay:.1f}s")
+            time.sleep(delay)
+
+    def _failed(self, error: Optional[BaseException]):
+        """A 429 only adjusts the limiter; anything else counts against the breaker"""
+        response = getattr(error, "response", None)
+        rate_limited = getattr(response, "status_code", None) == 429
+        try:
+            if rate_limited:
+                self._sync_limits(response.headers, retry_after=response.headers.get("retry-after"))
+        finally:
+            self._settle(failed=not rate_limited)
+
+    def _count_usage(self, usage):
+        with self._lock:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+
+    def _settle(self, failed: bool):
+        with self._lock:
+            self._probing = False
+            if not failed:
+                self._failures = 0
+                self._open_until = 0.0
+                return
+            self._failures += 1
+            if self._failures >= LLM_BREAKER_FAILURES:
+                self._open_until = time.monotonic() + LLM_BREAKER_COOLDOWN
+                if DEBUG:
+                    print(f"[LLMGateway] {self._failures} failures, pausing Groq for {LLM_BREAKER_COOLDOWN}s")
+
+    def _sync_limits(self, headers, retry_after: Optional[str] = None):
+        now = time.monotonic()
+        with self._lock:
+            try:
+                self._requests.sync(
+                    headers.get("x-ratelimit-remaining-requests"),
+                    headers.get("x-ratelimit-reset-requests"), now,
+                )
+                self._tokens.sync(
+                    headers.get("x-ratelimit-remaining-tokens"),
+                    headers.get("x-ratelimit-reset-tokens"), now,
+                )
+            except ValueError as e:
+                # A malformed header should not fail a good answer
+                if DEBUG:
+                    print(f"[LLMGateway] Ignoring rate-limit headers: {e}")
+            delay = _parse_retry_after(retry_after)
+            if delay:
+                self._requests.blocked_until = now + delay
+
+# Shared by everything that talks to Groq
+llm_gateway = LLMGateway()
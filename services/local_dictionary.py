@@ -0,0 +1,213 @@
+# services/local_dictionary.py
+import argparse
+import json
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import DICTIONARY_FILE, DICTIONARY_PENDING_FILE, DEBUG
+
+# File layout: magic, entry count, sorted table of record offsets, records.
+# Each record is a length-prefixed key followed by a length-prefixed JSON
+# list of [part of speech, definition] pairs.
+MAGIC = b"NEXDICT1"
+_HEADER = struct.Struct("<8sI")
+_OFFSET = struct.Struct("<I")
+_KEY_LEN = struct.Struct("<H")
+_VALUE_LEN = struct.Struct("<I")
+
+Senses = List[Tuple[str, str]]
+
+def senses_from_api(response) -> Senses:
+    """Definitions from a dictionaryapi.dev response"""
+    senses = []
+    for entry in response if isinstance(response, list) else []:
+        for meaning in entry.get("meanings", []):
+            pos = meaning.get("partOfSpeech", "")
+            for d in meaning.get("definitions", []):
+                if d.get("definition"):
+                    senses.append((pos, d["definition"]))
+    return senses
+
+def build(entries: Dict[str, Senses], path: Path):
+    """Write entries as a sorted, memory-mappable dictionary file"""
+    keys = sorted(entries)
+    table_size = _HEADER.size + _OFFSET.size * len(keys)
+    offsets, records = [], []
+    position = table_size
+    for key in keys:
+        k = key.encode("utf-8")
+        v = json.dumps(entries[key], separators=(",", ":")).encode("utf-8")
+        record = _KEY_LEN.pack(len(k)) + k + _VALUE_LEN.pack(len(v)) + v
+        offsets.append(position)
+        records.append(record)
+        position += len(record)
+
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(keys)))
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+        for record in records:
+            f.write(record)
+    tmp.replace(path)
+
+class LocalDictionary:
+    """Read-only mmap of the dictionary file plus words learned this session.
+
+    Words fetched online are appended to a pending file and folded into
+    the mapped file the next time the dictionary is opened.
+    """
+
+    def __init__(self, path: Path = DICTIONARY_FILE, pending_path: Path = DICTIONARY_PENDING_FILE):
+        self.path = path
+        self.pending_path = pending_path
+        self._learned: Dict[str, Senses] = {}
+        self._lock = threading.Lock()
+        self._map = None
+        self._count = 0
+        self._compact()
+        self._open()
+
+    def lookup(self, word: str) -> Optional[Senses]:
+        key = word.strip().lower()
+        with self._lock:
+            if key in self._learned:
+                return self._learned[key]
+        if not self._map:
+            return None
+
+        lo, hi = 0, self._count
+        target = key.encode("utf-8")
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current, value_at = self._key_at(mid)
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                (length,) = _VALUE_LEN.unpack_from(self._map, value_at)
+                start = value_at + _VALUE_LEN.size
+                return [tuple(s) for s in json.loads(self._map[start:start + length])]
+        return None
+
+    def add(self, word: str, senses: Senses):
+        """Back-fill a word fetched online"""
+        key = word.strip().lower()
+        if not key or not senses:
+            return
+        with self._lock:
+            self._learned[key] = senses
+            try:
+                with open(self.pending_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"word": key, "senses": senses}) + "\n")
+            except OSError as e:
+                print(f"[LocalDictionary] Failed to record {key}: {e}")
+
+    def entries(self) -> Dict[str, Senses]:
+        """Every word in the mapped file"""
+        result = {}
+        for i in range(self._count):
+            key, value_at = self._key_at(i)
+            (length,) = _VALUE_LEN.unpack_from(self._map, value_at)
+            start = value_at + _VALUE_LEN.size
+            result[key.decode("utf-8")] = [tuple(s) for s in json.loads(self._map[start:start + length])]
+        return result
+
+    def close(self):
+        if self._map:
+            self._map.close()
+            self._map = None
+
+    def _key_at(self, index: int) -> Tuple[bytes, int]:
+        (offset,) = _OFFSET.unpack_from(self._map, _HEADER.size + index * _OFFSET.size)
+        (length,) = _KEY_LEN.unpack_from(self._map, offset)
+        start = offset + _KEY_LEN.size
+        return self._map[start:start + length], start + length
+
+    def _open(self):
+        if not self.path.exists() or self.path.stat().st_size < _HEADER.size:
+            return
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            print(f"[LocalDictionary] {self.path} is not a dictionary file, ignoring it")
+            self.close()
+            self._count = 0
+        elif DEBUG:
+            print(f"[LocalDictionary] Mapped {self._count} words")
+
+    def _compact(self):
+        """Fold pending back-filled words into the mapped file"""
+        if not self.pending_path.exists():
+            return
+        learned = _read_pending(self.pending_path)
+        if learned:
+            self._open()
+            merged = self.entries() if self._map else {}
+            self.close()
+            merged.update(learned)
+            build(merged, self.path)
+        self.pending_path.unlink()
+
+def _read_pending(path: Path) -> Dict[str, Senses]:
+    entries = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+            entries[record["word"]] = [tuple(s) for s in record["senses"]]
+        except (ValueError, KeyError, TypeError):
+            continue
+    return entries
+
+def _read_word_list(path: Path) -> Iterable[Tuple[str, Senses]]:
+    """Lines of 'word<TAB>definition' or 'word<TAB>part of speech<TAB>definition'"""
+    for line in path.read_text(encoding="utf-8").splitlines():
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) == 2:
+            yield parts[0], [("", parts[1])]
+        elif len(parts) >= 3:
+            yield parts[0], [(parts[1], parts[2])]
+
+def _read_api_dump(path: Path) -> Iterable[Tuple[str, Senses]]:
+    """JSONL of raw dictionaryapi.dev responses"""
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            response = json.loads(line)
+            yield response[0]["word"], senses_from_api(response)
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Build Nex's offline dictionary")
+    parser.add_argument("--words", type=Path, action="append", default=[],
+                        help="tab separated word list")
+    parser.add_argument("--api-dump", type=Path, action="append", default=[],
+                        help="JSONL of dictionaryapi.dev responses")
+    parser.add_argument("--out", type=Path, default=DICTIONARY_FILE)
+    parser.add_argument("--replace", action="store_true",
+                        help="start from scratch instead of merging into --out")
+    args = parser.parse_args(argv)
+
+    entries: Dict[str, Senses] = {}
+    if not args.replace and args.out.exists():
+        existing = LocalDictionary(args.out, args.out.with_suffix(".pending"))
+        entries.update(existing.entries())
+        existing.close()
+
+    sources = [(_read_word_list, p) for p in args.words] + [(_read_api_dump, p) for p in args.api_dump]
+    for reader, path in sources:
+        for word, senses in reader(path):
+            key = word.strip().lower()
+            if key and senses:
+                entries.setdefault(key, [])
+                entries[key] += [s for s in senses if s not in entries[key]]
+
+    build(entries, args.out)
+    print(f"Wrote {len(entries)} words to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# services/prefetch.py
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from config.settings import (
+    PREFETCH_RECENT, PREFETCH_FETCH_BUDGET, PREFETCH_MAX_BACKOFF, DEBUG,
+)
+
+class _Source:
+    def __init__(self, name: str, fetch: Callable[[float], Optional[str]], size: int):
+        self.name = name
+        self.fetch = fetch
+        self.size = size
+        self.ready = deque()
+        self.recent = deque(maxlen=PREFETCH_RECENT)
+        self.failures = 0
+        self.retry_at = 0.0
+        self.served = 0
+        self.empty = 0
+
+class PrefetchPool:
+    """Keeps a few ready items per content source, refilled in the background.
+
+    fetch(deadline) returns one item or None and may raise on network
+    errors. Items matching anything buffered or recently served are
+    discarded. A failing source backs off exponentially, so an offline
+    network is not hammered.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, _Source] = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def register(self, name: str, fetch: Callable[[float], Optional[str]], size: int = 3):
+        with self._cond:
+            self._sources[name] = _Source(name, fetch, size)
+            self._cond.notify()
+
+    def take(self, name: str) -> Optional[str]:
+        """A ready item, or None if the buffer is empty"""
+        with self._cond:
+            source = self._sources.get(name)
+            if not source:
+                return None
+            self._cond.notify()
+            if not source.ready:
+                source.empty += 1
+                return None
+            item = source.ready.popleft()
+            source.recent.append(item)
+            source.served += 1
+            return item
+
+    def remember(self, name: str, item: str):
+        """Record an item served outside the buffer so it is not repeated"""
+        with self._cond:
+            source = self._sources.get(name)
+            if source:
+                source.recent.append(item)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._cond:
+            return {
+                s.name: {"ready": len(s.ready), "served": s.served, "empty": s.empty, "failures": s.failures}
+                for s in self._sources.values()
+            }
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._refill_loop, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _refill_loop(self):
+        while True:
+            with self._cond:
+                source, wait = self._next_source()
+                while self._running and source is None:
+                    self._cond.wait(wait)
+                    source, wait = self._next_source()
+                if not self._running:
+                    return
+
+            try:
+                item = source.fetch(time.monotonic() + PREFETCH_FETCH_BUDGET)
+                error = None
+            except Exception as e:
+                item, error = None, e
+
+            with self._cond:
+                if error is not None:
+                    source.failures += 1
+                    backoff = min(PREFETCH_MAX_BACKOFF, 2 ** source.failures)
+                    source.retry_at = time.monotonic() + backoff
+                    if DEBUG:
+                        print(f"[PrefetchPool] {source.name} unavailable, retrying in {backoff}s: {error}")
+                    continue
+                source.failures = 0
+                if item and item not in source.ready and item not in source.recent:
+                    source.ready.append(item)
+                else:
+                    # Duplicates mean the source is running dry; slow down
+                    source.retry_at = time.monotonic() + 1
+
+    def _next_source(self):
+        """Source most in need of an item, and how long to wait if none is eligible"""
+        now = time.monotonic()
+        best, wait = None, None
+        for source in self._sources.values():
+            if len(source.ready) >= source.size:
+                continue
+            if source.retry_at > now:
+                delay = source.retry_at - now
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            if best is None or len(source.ready) < len(best.ready):
+                best = source
+        return best, wait
@@ -1,15 +1,40 @@
 # services/reminder_service.py
-import json
+import re
 import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict
+from typing import Optional
+from core.event_bus import event_bus, Event, EventType
+from services.reminder_store import ReminderStore
+from services.timer_scheduler import TimerScheduler
 
 class ReminderService:
-    def __init__(self, reminders_file: Path):
-        self.reminders_file = reminders_file
-        self.active_timers = []
+    def __init__(self, reminders_db: Path, legacy_file: Optional[Path] = None):
+        self.store = ReminderStore(reminders_db, legacy_file)
+        self.timers = TimerScheduler(self.store)
+        self._wakeup = threading.Condition()
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        """Start firing due reminders, including any missed while stopped"""
+        with self._wakeup:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._reminder_loop, name="reminders", daemon=True)
+        self._thread.start()
+        self.timers.start()
+    
+    def shutdown(self):
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+        self.timers.shutdown()
+        self.store.close()
     
     def set_reminder(self, slots: dict, **kwargs) -> str:
         text = slots.get("text")
@@ -18,67 +43,145 @@ class ReminderService:
         if not text:
             return "What should I remind you about?"
         
-        reminder = {
-            "text": text,
-            "when": when or datetime.now().isoformat(),
-            "created": datetime.now().isoformat()
-        }
+        due = self._parse_when(when) if when else None
+        if due is None:
+            return f"When should I remind you to {text}?"
         
-        reminders = self._load_reminders()
-        reminders.append(reminder)
-        self._save_reminders(reminders)
+        self.store.add(text, due.timestamp())
+        with self._wakeup:
+            self._wakeup.notify_all()
         
-        return f"Reminder set: {text}"
+        return f"Reminder set: {text} {self._format_when(due)}"
     
     def list_reminders(self, slots: dict, **kwargs) -> str:
-        reminders = self._load_reminders()
+        when = (slots.get("datetime") or "").lower()
+        now = datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        if "tomorrow" in when:
+            start = midnight + timedelta(days=1)
+            reminders = self.store.between(start.timestamp(), (start + timedelta(days=1)).timestamp())
+        elif "today" in when:
+            reminders = self.store.between(now.timestamp(), (midnight + timedelta(days=1)).timestamp())
+        else:
+            reminders = self.store.upcoming(5)
         
         if not reminders:
             return "You have no reminders."
         
         lines = []
         for r in reminders:
-            when = r.get("when", "")
-            lines.append(f"- {r.get('text')} at {when}")
+            when = self._format_when(datetime.fromtimestamp(r["due"]))
+            lines.append(f"- {r['text']} {when}")
         
         return "\n".join(lines)
     
     def set_timer(self, slots: dict, **kwargs) -> str:
         try:
-            amount = int(slots.get("amount", 0))
-            unit = slots.get("unit", "seconds")
-            label = slots.get("label", "Timer")
-            
-            if unit.startswith("min"):
-                amount *= 60
-            elif unit.startswith("hour"):
-                amount *= 3600
-            
-            timer = threading.Timer(amount, self._timer_callback, args=[label])
-            timer.daemon = True
-            timer.start()
-            self.active_timers.append(timer)
-            
-            return f"Timer set for {amount} seconds."
-        except:
-            return "Timer cancelled."
+            amount = float(slots.get("amount") or 0)
+        except (TypeError, ValueError):
+            amount = 0
+        if amount <= 0:
+            return "How long should the timer be?"
+        
+        unit = (slots.get("unit") or "seconds").lower()
+        if unit.startswith("min"):
+            seconds = amount * 60
+        elif unit.startswith("h"):
+            seconds = amount * 3600
+        else:
+            seconds = amount
+        
+        label = (slots.get("label") or "").strip()
+        label = f"{label.capitalize()} timer" if label and "timer" not in label.lower() else (label or "Timer")
+        self.timers.add(label, seconds)
+        
+        return f"{label} set for {self._format_duration(seconds)}."
     
-    def _timer_callback(self, label: str):
-        from services.speech_service import SpeechService
-        # Create temporary instance for TTS
-        speech = SpeechService()
-        speech.speak(f"{label} done.")
+    def list_timers(self, slots: dict, **kwargs) -> str:
+        timers = self.timers.pending()
+        if not timers:
+            return "You have no timers running."
+        
+        lines = [f"- {t['label']}: {self._format_duration(t['remaining'])} left" for t in timers]
+        return "\n".join(lines)
     
-    def _load_reminders(self) -> List[Dict]:
+    def cancel_timer(self, slots: dict, **kwargs) -> str:
+        timers = self.timers.pending()
+        if not timers:
+            return "You have no timers running."
+        
+        label = (slots.get("label") or "").strip().lower()
+        if label:
+            timers = [t for t in timers if label in t["label"].lower()]
+            if not timers:
+                return f"I couldn't find a {label} timer."
+        
+        # Without a label, the timer closest to going off is the one meant
+        timer = timers[0]
+        self.timers.cancel(timer["id"])
+        return f"{timer['label']} cancelled."
+    
+    def _reminder_loop(self):
+        """Sleep until the earliest pending reminder, then publish it"""
+        while True:
+            for r in self.store.due():
+                self.store.mark_fired(r["id"])
+                event_bus.publish(Event(
+                    EventType.REMINDER_DUE,
+                    {"text": r["text"], "due": r["due"], "late": time.time() - r["due"]},
+                    source="reminders"
+                ))
+            
+            next_due = self.store.next_due()
+            with self._wakeup:
+                if not self._running:
+                    return
+                timeout = None if next_due is None else max(0.0, next_due - time.time())
+                self._wakeup.wait(timeout)
+                if not self._running:
+                    return
+    
+    def _parse_when(self, value: str) -> Optional[datetime]:
+        """Best-effort parse of the datetime slot"""
+        now = datetime.now()
+        v = value.strip().lower()
         try:
-            if self.reminders_file.exists():
-                return json.loads(self.reminders_file.read_text())
-        except:
+            return datetime.fromisoformat(v.upper())
+        except ValueError:
             pass
-        return []
+        
+        m = re.match(r"in (\d+) (second|minute|hour|day)s?$", v)
+        if m:
+            return now + timedelta(**{m.group(2) + "s": int(m.group(1))})
+        
+        day = now
+        if v.startswith("tomorrow"):
+            day = now + timedelta(days=1)
+            v = v[len("tomorrow"):].strip()
+        v = re.sub(r"^(?:today\s*)?(?:at\s+)?", "", v).replace(".", "")
+        
+        for fmt in ("%I %p", "%I%p", "%I:%M %p", "%I:%M%p", "%H:%M"):
+            try:
+                t = datetime.strptime(v, fmt)
+            except ValueError:
+                continue
+            due = day.replace(hour=t.hour, minute=t.minute, second=0, microsecond=0)
+            if due <= now and day is now:
+                due += timedelta(days=1)
+            return due
+        return None
     
-    def _save_reminders(self, reminders: List[Dict]):
-        try:
-            self.reminders_file.write_text(json.dumps(reminders, indent=2, default=str))
-        except Exception as e:
-            print(f"Failed to save reminders: {e}")
\ No newline at end of file
+    def _format_duration(self, seconds: float) -> str:
+        seconds = int(round(seconds))
+        parts = []
+        for name, size in (("hour", 3600), ("minute", 60), ("second", 1)):
+            count, seconds = divmod(seconds, size)
+            if count:
+                parts.append(f"{count} {name}{'s' if count != 1 else ''}")
+        return " ".join(parts) or "0 seconds"
+    
+    def _format_when(self, when: datetime) -> str:
+        if when.date() == datetime.now().date():
+            return when.strftime("at %I:%M %p")
+        return when.strftime("on %A, %B %d at %I:%M %p")
\ No newline at end of file
@@ -0,0 +1,120 @@
+# services/reminder_store.py
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional
+
+class ReminderStore:
+    """SQLite-backed reminders indexed by due time, plus pending timers"""
+
+    def __init__(self, db_path: Path, legacy_file: Optional[Path] = None):
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS reminders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    due REAL NOT NULL,
+                    created REAL NOT NULL,
+                    fired INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS reminders_pending ON reminders (fired, due)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS timers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    label TEXT NOT NULL,
+                    due REAL NOT NULL
+                )
+            """)
+        if legacy_file:
+            self._import_legacy(legacy_file)
+
+    def add(self, text: str, due: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO reminders (text, due, created) VALUES (?, ?, ?)",
+                (text, due, time.time()),
+            )
+            return cursor.lastrowid
+
+    def between(self, start: float, end: float) -> List[dict]:
+        """Pending reminders due in [start, end)"""
+        return self._query(
+            "SELECT * FROM reminders WHERE fired = 0 AND due >= ? AND due < ? ORDER BY due",
+            (start, end),
+        )
+
+    def upcoming(self, limit: int, now: float = None) -> List[dict]:
+        """Next pending reminders from now on"""
+        return self._query(
+            "SELECT * FROM reminders WHERE fired = 0 AND due >= ? ORDER BY due LIMIT ?",
+            (time.time() if now is None else now, limit),
+        )
+
+    def due(self, now: float = None) -> List[dict]:
+        """Pending reminders whose time has come"""
+        return self._query(
+            "SELECT * FROM reminders WHERE fired = 0 AND due <= ? ORDER BY due",
+            (time.time() if now is None else now,),
+        )
+
+    def next_due(self) -> Optional[float]:
+        rows = self._query("SELECT MIN(due) AS due FROM reminders WHERE fired = 0", ())
+        return rows[0]["due"] if rows else None
+
+    def mark_fired(self, reminder_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE reminders SET fired = 1 WHERE id = ?", (reminder_id,))
+
+    def add_timer(self, label: str, due: float) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "INSERT INTO timers (label, due) VALUES (?, ?)", (label, due)
+            ).lastrowid
+
+    def delete_timer(self, timer_id: int):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM timers WHERE id = ?", (timer_id,))
+
+    def pending_timers(self) -> List[dict]:
+        return self._query("SELECT * FROM timers ORDER BY due", ())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql: str, params: tuple) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def _import_legacy(self, legacy_file: Path):
+        """One-time import of the old reminders.json"""
+        if not legacy_file.exists():
+            return
+        try:
+            reminders = json.loads(legacy_file.read_text())
+        except Exception as e:
+            print(f"[ReminderStore] Could not read {legacy_file}, leaving it in place: {e}")
+            return
+
+        with self._lock, self._conn:
+            for r in reminders:
+                try:
+                    due = datetime.fromisoformat(r["when"]).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._conn.execute(
+                    "INSERT INTO reminders (text, due, created, fired) VALUES (?, ?, ?, ?)",
+                    (r.get("text") or "", due, time.time(), int(due < time.time())),
+                )
+        legacy_file.replace(legacy_file.with_suffix(".json.imported"))
@@ -1,14 +1,28 @@
 # services/speech_service.py
-import os
+import re
 import time
 import threading
 import contextlib
 import io
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 import speech_recognition as sr
 from gtts import gTTS
 import pygame
-from config.settings import AUDIO_TEMP_FILE, DEBUG, WAKE_WORDS
+from config.settings import (
+    DEBUG, WAKE_WORDS, TTS_ENGINE, TTS_LANG,
+    TTS_CACHE_MAX_TEXT, TTS_PREWARM_PHRASES, TTS_FRAGMENT_PREFIXES,
+    TTS_STREAM_MIN_CHARS, TTS_STREAM_CHUNK_CHARS, TTS_STREAM_WORKERS,
+)
+from core.tracing import tracer
+from services.tts_cache import tts_cache
+from services.audio_capture import AudioCapture
+from services.wake_word import WakeWordGate
+
+# Synthesis of sentence chunks runs ahead of playback on this pool
+_synthesis_pool = ThreadPoolExecutor(max_workers=TTS_STREAM_WORKERS, thread_name_prefix="tts")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
 
 class SpeechService:
     def __init__(self):
@@ -16,78 +30,218 @@ class SpeechService:
         self.is_speaking = threading.Event()
         self.is_speaking.set()  # Start ready to speak
         self._shutdown = threading.Event()
+        # Set to end the current clip early (shutdown or interruption)
+        self._stop_playback = threading.Event()  # Stop event of the current speak()
+        self._capture = None
+        self._wake_gate = None
+        self._mixer_ready = False
         
     def initialize(self):
         """Initialize audio system"""
         with contextlib.redirect_stdout(io.StringIO()):
             pygame.mixer.init()
+        self._mixer_ready = True
     
-    def speak(self, text: str, block: bool = True):
-        """Text-to-Speech with thread safety"""
+    def speak(self, text: str, block: bool = True, trace_id: Optional[str] = None,
+              stop: Optional[threading.Event] = None) -> bool:
+        """Text-to-Speech with thread safety; False if playback was cut short.
+        
+        Setting stop cuts this playback off. Each call has its own event and
+        nothing clears it, so a stop sent before playback starts still counts.
+        """
         if not text or self._shutdown.is_set():
-            return
+            return False
+        stop = stop or threading.Event()
         
         # Wait for any current speech to finish
         self.is_speaking.wait()
         self.is_speaking.clear()
+        self._stop_playback = stop
+        if self._shutdown.is_set():
+            stop.set()
         
         try:
-            tts = gTTS(text=str(text), lang="en")
-            tts.save(AUDIO_TEMP_FILE)
-            
-            pygame.mixer.music.load(AUDIO_TEMP_FILE)
-            pygame.mixer.music.play()
-            
-            if block:
-                while pygame.mixer.music.get_busy() and not self._shutdown.is_set():
-                    time.sleep(0.1)
-            
-            # Cleanup in background
-            threading.Thread(target=self._cleanup_audio, daemon=True).start()
-            
+            text = str(text)
+            if len(text) > TTS_STREAM_MIN_CHARS:
+                chunks = self._chunks(text)
+            else:
+                chunks = self._fragments(text)
+            self._play_pipelined(chunks, block, stop, trace_id)
+            return not stop.is_set()
         except Exception as e:
             print(f"[SpeechService] TTS error: {e}")
+            return False
         finally:
             self.is_speaking.set()
     
-    def _cleanup_audio(self):
-        """Clean up audio file after delay"""
-        time.sleep(0.3)
+    def stop(self):
+        """Cut the current clip short"""
+        self._stop_playback.set()
+    
+    def _play_pipelined(self, chunks: List[str], block: bool, stop: threading.Event,
+                        trace_id: Optional[str] = None):
+        """Play chunks back to back while later ones are still synthesizing"""
+        started = time.monotonic()
+        futures = [_synthesis_pool.submit(self._clip_bytes, chunk) for chunk in chunks]
+        channel = pygame.mixer.find_channel(True)
+        
+        # Start time of the clip currently playing; a channel holds only one
+        # queued sound, so the next clip is queued once this one has begun
+        playing_from = time.monotonic()
+        ends_at = playing_from
+        first_sound = None
         try:
-            if os.path.exists(AUDIO_TEMP_FILE):
-                os.remove(AUDIO_TEMP_FILE)
-        except Exception:
-            pass
+            for i, future in enumerate(futures):
+                sound = pygame.mixer.Sound(io.BytesIO(future.result()))
+                if stop.is_set():
+                    break
+                now = time.monotonic()
+                if i == 0:
+                    # First audio out ends the command's trace
+                    tracer.record("tts_synthesis", now - started, trace_id)
+                    tracer.end(trace_id, "wake_to_speech")
+                    first_sound = now
+                if i == 0 or now >= ends_at:
+                    channel.play(sound)
+                    playing_from = now
+                else:
+                    if stop.wait(timeout=max(0.0, playing_from - now)):
+                        break
+                    channel.queue(sound)
+                    playing_from = ends_at
+                ends_at = playing_from + sound.get_length()
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        if block:
+            self._wait_for_playback(channel, max(0.0, ends_at - time.monotonic()), stop)
+            if first_sound is not None:
+                tracer.record("playback", time.monotonic() - first_sound, trace_id)
+        elif stop.is_set():
+            channel.stop()
+    
+    def _clip_bytes(self, text: str) -> bytes:
+        if len(text) <= TTS_CACHE_MAX_TEXT:
+            return tts_cache.fetch(text, TTS_LANG, TTS_ENGINE, self._synthesize).read_bytes()
+        return self._synthesize(text, TTS_LANG)
+    
+    def _wait_for_playback(self, channel, duration: float, stop: threading.Event):
+        """Sleep until the clip ends or playback is stopped"""
+        # pygame only posts end events to the display event queue, which a Tk
+        # application never initializes, so the clip length is the end event
+        if stop.wait(timeout=duration):
+            channel.stop()
+    
+    def prewarm(self, phrases: List[str] = None):
+        """Synthesize fixed phrases into the TTS cache ahead of time"""
+        for phrase in phrases or TTS_PREWARM_PHRASES:
+            for fragment in self._fragments(phrase):
+                if self._shutdown.is_set():
+                    return
+                try:
+                    tts_cache.fetch(fragment, TTS_LANG, TTS_ENGINE, self._synthesize)
+                except Exception as e:
+                    print(f"[SpeechService] Prewarm failed for '{fragment}': {e}")
+                    return
+        if DEBUG:
+            print(f"[SpeechService] TTS cache warm: {tts_cache.stats()}")
+    
+    def _fragments(self, text: str) -> List[str]:
+        """Split templated responses into a shared prefix and the rest"""
+        for prefix in TTS_FRAGMENT_PREFIXES:
+            if text.startswith(prefix + " ") and len(text) > len(prefix) + 1:
+                return [prefix, text[len(prefix):].strip()]
+        return [text]
+    
+    def _chunks(self, text: str) -> List[str]:
+        """Split text into sentences, breaking long ones at commas"""
+        chunks = []
+        for sentence in _SENTENCE_END.split(text):
+            sentence = sentence.strip()
+            while len(sentence) > TTS_STREAM_CHUNK_CHARS:
+                cut = sentence.rfind(", ", 0, TTS_STREAM_CHUNK_CHARS)
+                if cut <= 0:
+                    cut = sentence.rfind(" ", 0, TTS_STREAM_CHUNK_CHARS)
+                if cut <= 0:
+                    break
+                chunks.append(sentence[:cut + 1].strip())
+                sentence = sentence[cut + 1:].strip()
+            if sentence:
+                chunks.append(sentence)
+        return chunks or [text]
+    
+    def _synthesize(self, text: str, lang: str) -> bytes:
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
     
     def listen(self, timeout: Optional[int] = 5, phrase_time_limit: int = 8) -> str:
         """Speech-to-Text"""
         if self._shutdown.is_set():
             return ""
         
-        with sr.Microphone() as source:
+        audio = self._next_phrase(timeout, phrase_time_limit)
+        if audio is None:
+            return ""
+        return self._recognize(audio)
+    
+    def listen_for_command(self, timeout: Optional[int] = 5, phrase_time_limit: int = 8,
+                           trace_id: Optional[str] = None) -> Optional[str]:
+        """Command spoken after the wake word, "" for a bare wake word, None otherwise.
+        
+        With a trace_id, the trace starts when the phrase ends and the
+        capture and recognition stages are recorded against it.
+        """
+        if self._shutdown.is_set():
+            return None
+        
+        audio = self._next_phrase(timeout, phrase_time_limit)
+        if audio is None:
+            return None
+        if trace_id:
+            tracer.begin(trace_id)
+            tracer.record("capture", len(audio.frame_data) / (audio.sample_rate * audio.sample_width), trace_id)
+        
+        with tracer.span("stt", trace_id):
+            return self._command_from(audio)
+    
+    def _command_from(self, audio: sr.AudioData) -> Optional[str]:
+        if self._wake_gate is None:
+            self._wake_gate = WakeWordGate()
+        
+        # Only audio that contains a wake word goes to cloud recognition
+        if self._wake_gate.available:
+            command_audio = self._wake_gate.process(audio)
+            if command_audio is not None:
+                if not self._wake_gate.has_speech(command_audio):
+                    return ""
+                return self._recognize(command_audio)
+            if self._wake_gate.available:
+                return None
+        
+        return self.extract_after_wake(self._recognize(audio))
+    
+    def _next_phrase(self, timeout: Optional[int], phrase_time_limit: int) -> Optional[sr.AudioData]:
+        if self._capture is None:
+            self._capture = AudioCapture()
+            self._capture.start()
+        
+        if DEBUG:
+            print("[SpeechService] Listening...")
+        
+        return self._capture.next_phrase(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    
+    def _recognize(self, audio: sr.AudioData) -> str:
+        try:
+            text = self.recognizer.recognize_google(audio)
             if DEBUG:
-                print("[SpeechService] Listening...")
-            
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            
-            try:
-                audio = self.recognizer.listen(
-                    source, 
-                    timeout=timeout, 
-                    phrase_time_limit=phrase_time_limit
-                )
-            except sr.WaitTimeoutError:
-                return ""
-            
-            try:
-                text = self.recognizer.recognize_google(audio)
-                if DEBUG:
-                    print(f"[SpeechService] Recognized: {text}")
-                return text.lower()
-            except sr.UnknownValueError:
-                return ""
-            except sr.RequestError:
-                return ""
+                print(f"[SpeechService] Recognized: {text}")
+            return text.lower()
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError:
+            return ""
     
     def extract_after_wake(self, text: str) -> Optional[str]:
         """Extract command after wake word"""
@@ -111,5 +265,9 @@ class SpeechService:
     def shutdown(self):
         """Graceful shutdown"""
         self._shutdown.set()
+        self._stop_playback.set()
         self.is_speaking.set()
-        pygame.mixer.quit()
\ No newline at end of file
+        if self._capture:
+            self._capture.stop()
+        if self._mixer_ready:
+            pygame.mixer.quit()
\ No newline at end of file
@@ -1,5 +1,12 @@
 # services/system_service.py
-import os
+import subprocess
+
+# target keyword -> (command, reply)
+APPS = (
+    (("calculator",), ["gnome-calculator"], "Opening calculator."),
+    (("terminal", "console"), ["gnome-terminal"], "Opening terminal."),
+    (("code", "vscode"), ["code"], "Opening VS Code."),
+)
 
 class SystemService:
     def control(self, slots: dict, **kwargs) -> str:
@@ -9,14 +16,22 @@ class SystemService:
         if any(k in t for k in ("exit", "quit", "stop", "goodbye")):
             return "EXIT"
         
-        if "calculator" in t:
-            os.system("gnome-calculator &")
-            return "Opening calculator."
-        elif "terminal" in t or "console" in t:
-            os.system("gnome-terminal &")
-            return "Opening terminal."
-        elif "code" in t or "vscode" in t:
-            os.system("code &")
-            return "Opening VS Code."
-        else:
-            return "I can't do that system action yet."
\ No newline at end of file
+        for keywords, command, reply in APPS:
+            if any(k in t for k in keywords):
+                return reply if self._launch(command) else f"I couldn't find {command[0]}."
+        return "I can't do that system action yet."
+    
+    def _launch(self, command: list) -> bool:
+        """Start an app detached from Nex, without a shell"""
+        try:
+            subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+                close_fds=True,
+            )
+            return True
+        except OSError:
+            return False
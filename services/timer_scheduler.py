@@ -0,0 +1,101 @@
+# services/timer_scheduler.py
+import heapq
+import threading
+import time
+from typing import List
+from core.event_bus import event_bus, Event, EventType
+from services.reminder_store import ReminderStore
+
+class TimerScheduler:
+    """All timers on one thread, ordered by a heap of due times.
+
+    Cancelled timers are dropped from the index immediately and skipped
+    when they reach the top of the heap. Pending timers live in the
+    reminder store, so they survive restarts and any that came due while
+    stopped fire as soon as the scheduler starts.
+    """
+
+    def __init__(self, store: ReminderStore):
+        self.store = store
+        self._heap = []
+        self._timers = {}  # id -> (due, label)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        for row in store.pending_timers():
+            self._timers[row["id"]] = (row["due"], row["label"])
+            self._heap.append((row["due"], row["id"]))
+        heapq.heapify(self._heap)
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="timers", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def add(self, label: str, seconds: float) -> int:
+        due = time.time() + seconds
+        timer_id = self.store.add_timer(label, due)
+        with self._cond:
+            self._timers[timer_id] = (due, label)
+            heapq.heappush(self._heap, (due, timer_id))
+            self._cond.notify()
+        return timer_id
+
+    def cancel(self, timer_id: int) -> bool:
+        with self._cond:
+            if self._timers.pop(timer_id, None) is None:
+                return False
+            # Rebuild once cancelled entries dominate the heap
+            if len(self._heap) > 2 * len(self._timers) + 16:
+                self._heap = [(due, i) for i, (due, _) in self._timers.items()]
+                heapq.heapify(self._heap)
+            self._cond.notify()
+        self.store.delete_timer(timer_id)
+        return True
+
+    def pending(self) -> List[dict]:
+        """Active timers, soonest first"""
+        now = time.time()
+        with self._cond:
+            timers = sorted(self._timers.items(), key=lambda item: item[1][0])
+        return [
+            {"id": i, "label": label, "due": due, "remaining": max(0.0, due - now)}
+            for i, (due, label) in timers
+        ]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    while self._heap and self._heap[0][1] not in self._timers:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, timer_id = self._heap[0]
+                    delay = due - time.time()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    _, label = self._timers.pop(timer_id)
+                    break
+
+            self.store.delete_timer(timer_id)
+            event_bus.publish(Event(
+                EventType.TIMER_DONE,
+                {"id": timer_id, "label": label, "due": due, "late": time.time() - due},
+                source="timers"
+            ))
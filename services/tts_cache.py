@@ -0,0 +1,111 @@
+# services/tts_cache.py
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Optional
+from config.settings import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, DEBUG
+
+class TTSCache:
+    """Content-addressed store of synthesized clips with LRU eviction.
+
+    Recency is kept in file mtimes so it survives restarts.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = Lock()
+        self._load_index()
+
+    @staticmethod
+    def key(text: str, lang: str, engine: str) -> str:
+        return hashlib.sha1(f"{engine}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, lang: str, engine: str) -> Optional[Path]:
+        key = self.key(text, lang, engine)
+        path = self._path(key)
+        with self._lock:
+            if key not in self._sizes or not path.exists():
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, text: str, lang: str, engine: str, data: bytes) -> Path:
+        key = self.key(text, lang, engine)
+        path = self._path(key)
+        tmp = path.with_name(f"{key}.{os.getpid()}.{id(data)}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        with self._lock:
+            self._forget(key)
+            self._sizes[key] = len(data)
+            self._total += len(data)
+            self._evict()
+        return path
+
+    def fetch(self, text: str, lang: str, engine: str,
+              synthesize: Callable[[str, str], bytes]) -> Path:
+        """Cached clip for text, synthesizing it on a miss"""
+        path = self.get(text, lang, engine)
+        if path:
+            return path
+        return self.put(text, lang, engine, synthesize(text, lang))
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "clips": len(self._sizes),
+            "bytes": self._total,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def _forget(self, key: str):
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self._total -= size
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._sizes) > 1:
+            key, size = self._sizes.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def _load_index(self):
+        for tmp in self.directory.glob("*.tmp"):
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+        files = sorted(self.directory.glob("*.mp3"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._sizes[path.stem] = size
+            self._total += size
+        self._evict()
+        if DEBUG and files:
+            print(f"[TTSCache] Indexed {len(self._sizes)} clips ({self._total} bytes)")
+
+# Shared by every SpeechService in the process
+tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
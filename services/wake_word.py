@@ -0,0 +1,133 @@
+# services/wake_word.py
+import audioop
+import os
+import tempfile
+import threading
+from typing import Iterable, Optional, Tuple
+import speech_recognition as sr
+from config.settings import (
+    WAKE_WORDS, WAKE_THRESHOLD, WAKE_MIN_SPEECH_SECONDS, WAKE_VAD_RATIO, MIC_MIN_ENERGY, DEBUG,
+)
+
+# pocketsphinx reports segment boundaries in 10 ms frames
+_FRAMES_PER_SECOND = 100
+_SAMPLE_RATE = 16000  # What the bundled acoustic model expects
+_VAD_WINDOW_SECONDS = 0.03
+
+class WakeWordGate:
+    """Offline filter in front of cloud recognition.
+
+    An energy VAD drops phrases without enough speech, then pocketsphinx
+    keyword spotting looks for any of WAKE_WORDS. Only the audio after the
+    wake word is returned for full recognition. One decoder is built up
+    front and reused for every phrase. Without pocketsphinx, or once the
+    spotter fails, the gate reports itself unavailable and callers fall
+    back to cloud STT.
+    """
+
+    def __init__(self, wake_words: Iterable[str] = None, threshold: float = WAKE_THRESHOLD):
+        self.keywords = sorted(wake_words or WAKE_WORDS)
+        self.threshold = threshold
+        self.checked = 0
+        self.no_speech = 0
+        self.no_wake = 0
+        self.passed = 0
+        self._lock = threading.Lock()
+        self._decoder = None
+        self.available = False
+        try:
+            self._decoder = self._build_decoder()
+            self.available = True
+        except ImportError:
+            if DEBUG:
+                print("[WakeWordGate] pocketsphinx not installed, wake word gate disabled")
+        except Exception as e:
+            print(f"[WakeWordGate] Keyword spotter unavailable, wake word gate disabled: {e}")
+
+    def process(self, audio: sr.AudioData) -> Optional[sr.AudioData]:
+        """Audio following the wake word, or None if there is none"""
+        self.checked += 1
+        if not self.has_speech(audio):
+            self.no_speech += 1
+            return None
+
+        found = self.spot(audio)
+        if found is None:
+            self.no_wake += 1
+            return None
+
+        self.passed += 1
+        word, end = found
+        if DEBUG:
+            print(f"[WakeWordGate] Spotted '{word}' ending at {end:.2f}s")
+        return self._slice(audio, end)
+
+    def has_speech(self, audio: sr.AudioData) -> bool:
+        """Energy VAD: enough windows well above the phrase's own noise floor"""
+        width = audio.sample_width
+        step = int(audio.sample_rate * _VAD_WINDOW_SECONDS) * width
+        data = audio.frame_data
+        energies = [audioop.rms(data[i:i + step], width) for i in range(0, len(data) - step + 1, step)]
+        if not energies:
+            return False
+        floor = sorted(energies)[len(energies) // 5] or 1
+        loud = max(floor * WAKE_VAD_RATIO, MIC_MIN_ENERGY)
+        voiced = sum(1 for e in energies if e > loud)
+        return voiced * _VAD_WINDOW_SECONDS >= WAKE_MIN_SPEECH_SECONDS
+
+    def spot(self, audio: sr.AudioData) -> Optional[Tuple[str, float]]:
+        """First wake word and the time it ends, in seconds"""
+        if self._decoder is None:
+            return None
+        raw = audio.get_raw_data(convert_rate=_SAMPLE_RATE, convert_width=2)
+        try:
+            with self._lock:
+                self._decoder.start_utt()
+                self._decoder.process_raw(raw, full_utt=True)
+                self._decoder.end_utt()
+                segments = [(seg.word, seg.end_frame) for seg in self._decoder.seg() or []]
+        except Exception as e:
+            print(f"[WakeWordGate] Keyword spotter failed, disabling gate: {e}")
+            self.available = False
+            return None
+
+        for word, end in segments:
+            word = word.strip().lower()
+            if word.split("(")[0] in self.keywords:
+                return word, end / _FRAMES_PER_SECOND
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.checked,
+            "no_speech": self.no_speech,
+            "no_wake": self.no_wake,
+            "passed": self.passed,
+        }
+
+    def _build_decoder(self):
+        """Keyword search over the wake words pocketsphinx can pronounce"""
+        from pocketsphinx import Decoder
+        decoder = Decoder(lm=None, logfn=os.devnull)
+
+        # A word missing from the dictionary would make add_kws fail outright
+        unknown = [w for w in self.keywords if decoder.lookup_word(w) is None]
+        if unknown:
+            print(f"[WakeWordGate] Not in the pronunciation dictionary, not spotted: {', '.join(unknown)}")
+        self.keywords = [w for w in self.keywords if w not in unknown]
+        if not self.keywords:
+            raise RuntimeError("no wake word is in the pronunciation dictionary")
+
+        # Keyword lists are only read from a file
+        with tempfile.NamedTemporaryFile("w", suffix=".kws", delete=False) as f:
+            f.writelines(f"{w} /{self.threshold:g}/\n" for w in self.keywords)
+        try:
+            decoder.add_kws("wake", f.name)
+        finally:
+            os.unlink(f.name)
+        decoder.activate_search("wake")
+        return decoder
+
+    def _slice(self, audio: sr.AudioData, start: float) -> sr.AudioData:
+        offset = int(start * audio.sample_rate) * audio.sample_width
+        return sr.AudioData(audio.frame_data[offset:], audio.sample_rate, audio.sample_width)
@@ -1,30 +1,201 @@
 # services/weather_service.py
-import requests
+import json
 import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from services.http_client import http_client
+from config.settings import (
+    WEATHER_FRESH_SECONDS, WEATHER_MAX_STALE_SECONDS, WEATHER_BAD_CITY_SECONDS,
+    WEATHER_PREFETCH_INTERVAL, WEATHER_PREFETCH_CITIES, DEBUG,
+)
+
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
 
 class WeatherService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cities_file: Optional[Path] = None):
         self.api_key = api_key
-    
+        self.cities_file = cities_file
+        # Canonical city name -> OpenWeather city id; names the API rejected
+        # are remembered until their entry in _bad_until expires
+        self._cities = {}
+        self._bad_until = {}
+        # City id -> (fetched at, response)
+        self._reports = {}
+        self._requested = Counter()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # The prefetch thread and shutdown both save
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._staleness_served = 0.0
+        self._load_cities()
+
+    def start(self):
+        """Keep the most requested cities warm in the background"""
+        if self._thread or not self.api_key:
+            return
+        self._thread = threading.Thread(target=self._prefetch_loop, name="weather-prefetch", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self._save_cities()
+
     def get_weather(self, slots: dict, **kwargs) -> str:
         city = slots.get("city")
-        
+
         if not city:
             return "Which city do you want the weather for?"
-        
+
         if not self.api_key:
             return "Weather API key not configured."
-        
+
+        key = self._canonical(city)
+        deadline = kwargs.get("deadline") or time.monotonic() + 8
+        cancel = kwargs.get("cancel")
+
+        with self._lock:
+            if self._bad_until.get(key, 0) > time.time():
+                return f"Sorry, I couldn't find weather for {city}."
+            city_id = self._cities.get(key)
+            report = self._reports.get(city_id) if city_id else None
+
         try:
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={self.api_key}&units=metric"
-            response = requests.get(url, timeout=8)
-            data = response.json()
-            
+            if report:
+                data = self._serve_cached(city_id, report, deadline, cancel)
+            else:
+                data = self._fetch(deadline, cancel, q=city)
+                with self._lock:
+                    self.misses += 1
+
+            if str(data.get("cod")) == "404":
+                with self._lock:
+                    self._bad_until[key] = time.time() + WEATHER_BAD_CITY_SECONDS
             if data.get("cod") != 200:
                 return f"Sorry, I couldn't find weather for {city}."
-            
+
+            with self._lock:
+                self._cities[key] = data["id"]
+                self._requested[data["id"]] += 1
+
             temp = data["main"]["temp"]
             desc = data["weather"][0]["description"]
-            return f"The weather in {city} is {desc} with a temperature of {temp}°C."
+            name = data.get("name") or city
+            return f"The weather in {name} is {desc} with a temperature of {temp}°C."
+        except Exception as e:
+            return f"I couldn't reach the weather service: {e}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.stale_hits
+            total = served + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": served / total if total else 0.0,
+                "avg_staleness": self._staleness_served / served if served else 0.0,
+                "cities": len(self._cities),
+                "bad_cities": sum(1 for t in self._bad_until.values() if t > time.time()),
+            }
+
+    def _serve_cached(self, city_id: int, report: tuple, deadline: float, cancel=None) -> dict:
+        """Fresh or stale-but-usable report; stale ones are refreshed in the background"""
+        fetched, data = report
+        age = time.time() - fetched
+        if age > WEATHER_MAX_STALE_SECONDS:
+            with self._lock:
+                self.misses += 1
+            return self._fetch(deadline, cancel, id=city_id)
+
+        with self._lock:
+            self._staleness_served += age
+            if age <= WEATHER_FRESH_SECONDS:
+                self.hits += 1
+                return data
+            self.stale_hits += 1
+        self._refresh_async(city_id)
+        return data
+
+    def _fetch(self, deadline: float, cancel=None, **query) -> dict:
+        response = http_client.get(
+            WEATHER_URL,
+            params={**query, "appid": self.api_key, "units": "metric"},
+            deadline=deadline,
+            cancel=cancel,
+        )
+        data = response.json()
+        if data.get("cod") == 200:
+            with self._lock:
+                self._reports[data["id"]] = (time.time(), data)
+        return data
+
+    def _refresh_async(self, city_id: int):
+        with self._lock:
+            if city_id in self._refreshing:
+                return
+            self._refreshing.add(city_id)
+        threading.Thread(target=self._refresh, args=(city_id,), daemon=True).start()
+
+    def _refresh(self, city_id: int):
+        try:
+            self._fetch(time.monotonic() + 10, id=city_id)
+        except Exception as e:
+            if DEBUG:
+                print(f"[WeatherService] Background refresh of {city_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(city_id)
+
+    def _prefetch_loop(self):
+        while not self._stop.wait(WEATHER_PREFETCH_INTERVAL):
+            with self._lock:
+                frequent = [city_id for city_id, _ in self._requested.most_common(WEATHER_PREFETCH_CITIES)]
+                due = [
+                    city_id for city_id in frequent
+                    if time.time() - self._reports.get(city_id, (0, None))[0] > WEATHER_FRESH_SECONDS / 2
+                ]
+            for city_id in due:
+                self._refresh(city_id)
+            self._save_cities()
+
+    def _canonical(self, city: str) -> str:
+        return " ".join(re.sub(r"[^\w\s-]", " ", city.lower()).split())
+
+    def _load_cities(self):
+        if not self.cities_file or not self.cities_file.exists():
+            return
+        try:
+            saved = json.loads(self.cities_file.read_text())
+            self._cities.update(saved.get("cities", {}))
+            self._requested.update({int(k): v for k, v in saved.get("requested", {}).items()})
+            now = time.time()
+            self._bad_until.update({k: t for k, t in saved.get("bad", {}).items() if t > now})
+        except Exception as e:
+            print(f"[WeatherService] Ignoring unreadable city index: {e}")
+
+    def _save_cities(self):
+        if not self.cities_file:
+            return
+        with self._lock:
+            now = time.time()
+            saved = {
+                "cities": dict(self._cities),
+                "requested": dict(self._requested),
+                # Expiries are wall-clock, so they still hold after a restart
+                "bad": {k: t for k, t in self._bad_until.items() if t > now},
+            }
+        try:
+            # Write aside and swap in, so a crash mid-write can't corrupt the index
+            with self._save_lock:
+                tmp = self.cities_file.with_suffix(".tmp")
+                tmp.write_text(json.dumps(saved))
+                tmp.replace(self.cities_file)
         except Exception as e:
-            return f"I couldn't reach the weather service: {e}"
\ No newline at end of file
+            print(f"[WeatherService] Failed to save city index: {e}")
@@ -1,8 +1,14 @@
 # services/web_service.py
+import time
 import webbrowser
-import requests
+from services.http_client import http_client
+from services.local_dictionary import LocalDictionary, senses_from_api
+from config.settings import DEFINE_MAX_SENSES
 
 class WebService:
+    def __init__(self):
+        self.dictionary = LocalDictionary()
+    
     def search(self, slots: dict, **kwargs) -> str:
         query = slots.get("query")
         if not query:
@@ -42,24 +48,48 @@ class WebService:
         if not word:
             return "Which word should I define?"
         
-        try:
-            response = requests.get(
-                f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}",
-                timeout=6
-            ).json()
-            meaning = response[0]["meanings"][0]["definitions"][0]["definition"]
-            return meaning
-        except:
+        senses = self.dictionary.lookup(word)
+        if senses is None:
+            # Online fallback; results are kept for offline use
+            try:
+                response = http_client.get(
+                    f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}",
+                    deadline=kwargs.get("deadline") or time.monotonic() + 6,
+                    cancel=kwargs.get("cancel"),
+                ).json()
+                senses = senses_from_api(response)
+            except Exception:
+                senses = []
+            self.dictionary.add(word, senses)
+        
+        if not senses:
             return "I couldn't find that definition."
+        return self._format_senses(senses)
+    
+    def _format_senses(self, senses) -> str:
+        """First definition per part of speech, up to DEFINE_MAX_SENSES"""
+        seen, picked = set(), []
+        for pos, definition in senses:
+            if pos not in seen:
+                seen.add(pos)
+                picked.append(f"{pos.capitalize()}: {definition}" if pos else definition)
+        return " ".join(picked[:DEFINE_MAX_SENSES])
     
     def get_joke(self, slots: dict, **kwargs) -> str:
         try:
-            url = "https://v2.jokeapi.dev/joke/Any?blacklistFlags=nsfw,religious,political,racist,sexist,explicit"
-            data = requests.get(url, timeout=6).json()
-            
-            if data.get("type") == "single":
-                return data.get("joke")
-            else:
-                return f"{data.get('setup')} ... {data.get('delivery')}"
+            return self.fetch_joke(kwargs.get("deadline") or time.monotonic() + 6, kwargs.get("cancel"))
         except:
-            return "I couldn't get a joke right now."
\ No newline at end of file
+            return "I couldn't get a joke right now."
+    
+    def fetch_joke(self, deadline: float, cancel=None) -> str:
+        data = http_client.get(
+            "https://v2.jokeapi.dev/joke/Any",
+            params={"blacklistFlags": "nsfw,religious,political,racist,sexist,explicit"},
+            deadline=deadline,
+            cancel=cancel,
+        ).json()
+        
+        if data.get("type") == "single":
+            return data.get("joke")
+        else:
+            return f"{data.get('setup')} ... {data.get('delivery')}"
\ No newline at end of file
@@ -0,0 +1,170 @@
+# ui/chat_server.py
+import asyncio
+import itertools
+import json
+import time
+from typing import Dict
+from core.event_bus import EventBus, Event, EventType
+from core.tracing import tracer
+from config.settings import SERVER_MAX_CLIENTS, SERVER_MAX_IN_FLIGHT, SERVER_REQUEST_TIMEOUT, DEBUG
+
+class _Session:
+    def __init__(self, session_id: str, writer: asyncio.StreamWriter):
+        self.id = session_id
+        self.writer = writer
+        self.started = time.monotonic()
+        self.requests = 0
+
+class ChatServer:
+    """Chat front end over a local socket, for headless use.
+
+    Clients send one command per line, either plain text or JSON with a
+    "text" field (and an optional "id" that is echoed back), and receive
+    one JSON line per answer. Each connection is a session: its commands
+    are answered in order, while separate sessions run concurrently.
+    Announcements without a session, such as reminders, go to every client.
+    """
+
+    def __init__(self, event_bus: EventBus, host: str, port: int):
+        self.event_bus = event_bus
+        self.host = host
+        self.port = port
+        self._sessions: Dict[str, _Session] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._slots = None
+        self.event_bus.subscribe(EventType.CHAT_RESPONSE, self._on_response)
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(SERVER_MAX_IN_FLIGHT)
+        server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        print(f"[ChatServer] Listening on {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "in_flight": len(self._pending),
+            "requests": sum(s.requests for s in self._sessions.values()),
+        }
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self._sessions) >= SERVER_MAX_CLIENTS:
+            await self._send(writer, {"error": "server busy"})
+            writer.close()
+            return
+
+        session = _Session(f"s{next(self._ids)}", writer)
+        self._sessions[session.id] = session
+        if DEBUG:
+            print(f"[ChatServer] {session.id} connected from {writer.get_extra_info('peername')}")
+        try:
+            while True:
+                try:
+                    line = await self._read_line(reader)
+                except ValueError:
+                    await self._send(writer, {"error": "line too long"})
+                    continue
+                if not line:
+                    break
+                try:
+                    text, request_id = self._parse(line.decode("utf-8", "replace").strip())
+                except ValueError:
+                    await self._send(writer, {"error": "expected text or a JSON object with text"})
+                    continue
+                if not text:
+                    continue
+                session.requests += 1
+                reply = await self._ask(session, text)
+                if request_id is not None:
+                    reply["id"] = request_id
+                await self._send(writer, reply)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._sessions[session.id]
+            writer.close()
+            if DEBUG:
+                print(f"[ChatServer] {session.id} disconnected after {session.requests} requests")
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        """Next line (b"" at EOF); an overlong line is skipped whole and raises ValueError"""
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError:
+            pass
+        # Drop the rest of the line, including any part still to arrive
+        while True:
+            try:
+                await reader.readuntil(b"\n")
+                break
+            except asyncio.LimitOverrunError as e:
+                await reader.readexactly(e.consumed)
+            except asyncio.IncompleteReadError:
+                break
+        raise ValueError("line too long")
+
+    async def _ask(self, session: _Session, text: str) -> dict:
+        """Publish one command and wait for the response carrying its trace_id"""
+        async with self._slots:
+            event = Event(EventType.CHAT_INPUT, {"text": text, "session": session.id}, source="chat")
+            future = self._loop.create_future()
+            self._pending[event.trace_id] = future
+            try:
+                # Publishing can block while the chat workers' queues are full
+                published = await self._loop.run_in_executor(None, self.event_bus.publish_async, event)
+                if published.done() and published.exception():
+                    return {"error": f"{published.exception()}"}
+                text = await asyncio.wait_for(future, SERVER_REQUEST_TIMEOUT)
+                tracer.end(event.trace_id, "chat_response")
+                return {"text": text}
+            except asyncio.TimeoutError:
+                tracer.discard(event.trace_id)
+                # Stop the action too, rather than leave it running for nobody
+                self.event_bus.publish(Event(EventType.CANCEL_REQUEST, {"trace_id": event.trace_id}, source="chat"))
+                return {"error": "timed out"}
+            finally:
+                self._pending.pop(event.trace_id, None)
+
+    def _on_response(self, event: Event):
+        """Runs on a bus worker: hand the response to the loop"""
+        if self._loop is None:
+            return
+        text = event.data.get("text", "Sorry, I couldn't process that.")
+        if event.data.get("session"):
+            self._loop.call_soon_threadsafe(self._resolve, event.trace_id, text)
+        else:
+            self._loop.call_soon_threadsafe(self._broadcast, text)
+
+    def _resolve(self, trace_id: str, text: str):
+        future = self._pending.get(trace_id)
+        if future and not future.done():
+            future.set_result(text)
+
+    def _broadcast(self, text: str):
+        for session in list(self._sessions.values()):
+            asyncio.ensure_future(self._send(session.writer, {"text": text, "broadcast": True}))
+
+    async def _send(self, writer: asyncio.StreamWriter, message: dict):
+        try:
+            writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _parse(self, line: str):
+        """Command text and the client's request id, if any"""
+        if not line.startswith("{"):
+            return line, None
+        message = json.loads(line)
+        if not isinstance(message, dict):
+            raise ValueError("not an object")
+        text = message.get("text", "")
+        if not isinstance(text, str):
+            raise ValueError("text is not a string")
+        return text.strip(), message.get("id")
@@ -1,6 +1,9 @@
 # ui/chat_window.py
+import queue
 import tkinter as tk
 from core.event_bus import event_bus, Event, EventType
+from core.tracing import tracer
+from core.intent_rules import is_cancel_command
 
 class ChatWindow:
     def __init__(self):
@@ -19,8 +22,12 @@ class ChatWindow:
         # Setup UI
         self._setup_ui()
         
+        # Responses arrive on event bus worker threads; Tk may only be
+        # touched from the mainloop thread, so they are handed over here
+        self._responses = queue.Queue()
+        
         # Subscribe to chat responses
-        event_bus.subscribe(EventType.CHAT_RESPONSE, self._display_response)
+        event_bus.subscribe(EventType.CHAT_RESPONSE, self._queue_response)
     
     def _setup_ui(self):
         """Setup chat interface"""
@@ -47,10 +54,15 @@ class ChatWindow:
         self.entry.delete(0, "end")
         self._display_message("You", user_text)
         
+        if is_cancel_command(user_text):
+            event_bus.publish(Event(EventType.CANCEL_REQUEST, {"source": "chat"}, source="chat"))
+            return
+        
         # Publish chat input event
         event_bus.publish(Event(
             EventType.CHAT_INPUT,
-            {"text": user_text}
+            {"text": user_text},
+            source="chat"
         ))
     
     def _display_message(self, sender: str, text: str):
@@ -60,13 +72,32 @@ class ChatWindow:
         self.chat_log.see("end")
         self.chat_log.config(state="disabled")
     
+    def _queue_response(self, event: Event):
+        """Hand a response over to the Tk thread"""
+        # Answers to server sessions are not for this window
+        if event.data.get("session"):
+            return
+        self._responses.put(event)
+    
+    def _poll_responses(self):
+        """Drain queued responses on the Tk thread"""
+        while True:
+            try:
+                event = self._responses.get_nowait()
+            except queue.Empty:
+                break
+            self._display_response(event)
+        self.root.after(50, self._poll_responses)
+    
     def _display_response(self, event: Event):
         """Display assistant response"""
         text = event.data.get("text", "Sorry, I couldn't process that.")
         self._display_message("Nex", text)
+        tracer.end(event.trace_id, "chat_response")
     
     def run(self):
         """Start GUI event loop"""
+        self.root.after(50, self._poll_responses)
         self.root.mainloop()
     
     def close(self):
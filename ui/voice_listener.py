@@ -2,12 +2,16 @@
 import threading
 import time
 from core.event_bus import event_bus, Event, EventType
-from services.speech_service import SpeechService
-from config.settings import DEBUG, WAKE_WORDS
+from core.startup import timeline
+from core.tracing import tracer, new_trace_id
+from core.intent_rules import is_cancel_command
+from services.audio_output import audio_output, PRIORITY_ANNOUNCEMENT
+from config.settings import DEBUG
 
 class VoiceListener:
     def __init__(self):
-        self.speech_service = SpeechService()
+        # Built by start(), which runs off the UI thread
+        self.speech_service = None
         self.is_running = False
         self.thread = None
     
@@ -16,19 +20,24 @@ class VoiceListener:
         if self.is_running:
             return
         
+        with timeline.step("import speech_service"):
+            from services.speech_service import SpeechService
+        self.speech_service = SpeechService()
         self.is_running = True
         self.thread = threading.Thread(target=self._listen_loop, daemon=True)
         self.thread.start()
         print("[VoiceListener] Voice listening started")
         
         # Test speech to confirm audio works
-        self.speech_service.speak("Voice system initialized")
+        audio_output.say("Voice system initialized", PRIORITY_ANNOUNCEMENT)
     
     def stop(self):
         """Stop voice listening"""
         self.is_running = False
         if self.thread:
             self.thread.join(timeout=1)
+        if self.speech_service:
+            self.speech_service.shutdown()
         print("[VoiceListener] Voice listening stopped")
     
     def _listen_loop(self):
@@ -39,30 +48,31 @@ class VoiceListener:
                 if DEBUG:
                     print("[VoiceListener] Listening for speech...")
                 
-                audio = self.speech_service.listen(timeout=1, phrase_time_limit=5)
-                if not audio:
-                    continue
-                
-                if DEBUG:
-                    print(f"[VoiceListener] Raw speech detected: {audio}")
+                # Wake word spotting runs locally; only commands reach cloud STT
+                trace_id = new_trace_id()
+                command = self.speech_service.listen_for_command(
+                    timeout=1, phrase_time_limit=5, trace_id=trace_id,
+                )
                 
-                # Check for wake word in the detected speech
-                command = self.speech_service.extract_after_wake(audio)
-                
-                if command is not None:
+                if command is None:
+                    tracer.discard(trace_id)
+                elif is_cancel_command(command):
+                    # Handled right away, not queued behind the command it cancels
+                    tracer.discard(trace_id)
+                    event_bus.publish(Event(EventType.CANCEL_REQUEST, {"source": "voice"}, source="voice"))
+                else:
                     print(f"[VoiceListener] Wake word detected! Command: {command}")
                     
                     # Publish voice input event
                     event_bus.publish(Event(
                         EventType.VOICE_INPUT,
-                        {"text": command}
+                        {"text": command},
+                        source="voice",
+                        trace_id=trace_id,
                     ))
                     
                     # Small delay to prevent rapid firing
                     time.sleep(0.5)
-                else:
-                    if DEBUG:
-                        print("[VoiceListener] No wake word found")
                 
             except Exception as e:
                 print(f"[VoiceListener] Error: {e}")